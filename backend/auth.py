@@ -1,10 +1,15 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
+import asyncio
+import hashlib
+import time
 import jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 import os
 from dotenv import load_dotenv
+from cache import TTLCache
 import uuid
 
 load_dotenv()
@@ -12,6 +17,9 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "64"))
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "50000"))
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -21,6 +29,34 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event
+# loop. Jobs beyond the workers plus the queue limit are rejected with a 503
+# instead of piling up behind a login storm.
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+pending_password_jobs = 0
+
+async def run_password_job(func, *args):
+    global pending_password_jobs
+    if pending_password_jobs >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_LIMIT:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+    
+    pending_password_jobs += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_executor, func, *args)
+    finally:
+        pending_password_jobs -= 1
+
+async def verify_password_async(plain_password, hashed_password):
+    return await run_password_job(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    return await run_password_job(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -31,7 +67,20 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# Verified tokens keyed by SHA-256 digest -> (user_id, exp). Entries never
+# outlive the token itself, and only tokens that passed jwt.decode get in, so
+# a tampered token (different digest) always goes through full verification.
+token_cache = TTLCache(maxsize=TOKEN_CACHE_MAX_SIZE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
 def verify_token(token: str):
+    digest = hashlib.sha256(token.encode()).digest()
+    cached = token_cache.get(digest)
+    if cached is not None:
+        user_id, exp = cached
+        if time.time() < exp:
+            return user_id
+        token_cache.invalidate(digest)
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
@@ -41,13 +90,19 @@ def verify_token(token: str):
                 detail="Invalid authentication credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        return user_id
     except jwt.PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    
+    exp = payload.get("exp")
+    if exp is not None:
+        remaining = exp - time.time()
+        if remaining > 0:
+            token_cache.set(digest, (user_id, exp), ttl=remaining)
+    return user_id
 
 def generate_uuid():
     return str(uuid.uuid4())
\ No newline at end of file
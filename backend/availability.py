@@ -0,0 +1,69 @@
+from pymongo.errors import BulkWriteError
+from database import property_nights_collection
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+# Each reserved night is one document, and (property_id, night) is unique, so
+# the database itself rejects a second booking for any night already taken.
+# Reserving is therefore atomic without transactions: either every night of
+# the stay is inserted, or the ones this attempt inserted are rolled back.
+# Rollbacks never touch rows they did not write: a booking being reactivated
+# twice at once keeps the nights the winning request claimed.
+
+ACTIVE_BOOKING_STATUSES = ["pending", "confirmed"]
+
+def booking_nights(check_in: datetime, check_out: datetime) -> List[datetime]:
+    first_night = datetime(check_in.year, check_in.month, check_in.day)
+    last_day = datetime(check_out.year, check_out.month, check_out.day)
+    nights = []
+    night = first_night
+    while night < last_day:
+        nights.append(night)
+        night += timedelta(days=1)
+    return nights
+
+async def reserve_nights(property_id: str, booking_id: str, check_in: datetime, check_out: datetime) -> bool:
+    """Claim every night of the stay for `booking_id`; False if any is taken."""
+    nights = booking_nights(check_in, check_out)
+    try:
+        await property_nights_collection.insert_many(
+            [{"property_id": property_id, "night": night, "booking_id": booking_id} for night in nights],
+            ordered=True
+        )
+    except BulkWriteError as error:
+        # Ordered inserts stop at the first taken night, so ours are the ones before it
+        inserted = nights[:error.details["nInserted"]]
+        if inserted:
+            await release_nights(booking_id, inserted)
+        return False
+    return True
+
+async def release_nights(booking_id: str, nights: Optional[List[datetime]] = None):
+    """Free the booking's nights, or only `nights` of them when given."""
+    query = {"booking_id": booking_id}
+    if nights is not None:
+        query["night"] = {"$in": nights}
+    await property_nights_collection.delete_many(query)
+
+def exclude_booked(check_in: datetime, check_out: datetime) -> List[dict]:
+    """Pipeline stages that drop properties with any night of the stay reserved.
+
+    Each property probes the (property_id, night) index for its own nights and
+    stops at the first hit, so no list of booked ids is built in the app.
+    """
+    nights = booking_nights(check_in, check_out)
+    return [
+        {"$lookup": {
+            "from": "property_nights",
+            "localField": "id",
+            "foreignField": "property_id",
+            "pipeline": [
+                {"$match": {"night": {"$gte": nights[0], "$lte": nights[-1]}}},
+                {"$limit": 1},
+                {"$project": {"_id": 1}}
+            ],
+            "as": "booked_nights"
+        }},
+        {"$match": {"booked_nights": {"$size": 0}}},
+        {"$project": {"booked_nights": 0}}
+    ]
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import time
+
+class CacheBackend:
+    """Interface shared by cache stores; a shared (e.g. networked) store
+    implements the same methods so callers can swap it in."""
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    def invalidate(self, key: Hashable):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        raise NotImplementedError
+
+class TTLCache(CacheBackend):
+    """In-process LRU cache whose entries also expire after a fixed TTL."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self.entries[key] = (value, expires_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        self.entries.pop(key, None)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
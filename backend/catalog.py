@@ -0,0 +1,272 @@
+from database import properties_collection
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import re
+import time
+import numpy as np
+
+PROPERTY_SNAPSHOT = os.getenv("PROPERTY_SNAPSHOT", "false").lower() in ("1", "true", "yes")
+SNAPSHOT_REFRESH_SECONDS = float(os.getenv("PROPERTY_SNAPSHOT_REFRESH_SECONDS", "5"))
+# Incremental refreshes only see documents whose updated_at moved, so a
+# periodic full reload also drops properties deleted outside the API
+SNAPSHOT_FULL_RELOAD_SECONDS = float(os.getenv("PROPERTY_SNAPSHOT_FULL_RELOAD_SECONDS", "600"))
+REFRESH_OVERLAP = timedelta(seconds=2)
+# Row order of the snapshot; the same order as the default property listing
+NEWEST_FIRST = [("created_at", -1), ("id", -1)]
+
+EPOCH = datetime(1970, 1, 1)
+ESCAPED_CHARACTER = re.compile(r"\\(.)")
+
+logger = logging.getLogger(__name__)
+
+class Unsupported(Exception):
+    """The filter or sort uses something the snapshot does not index; ask MongoDB."""
+
+def _micros(value) -> int:
+    return (value - EPOCH) // timedelta(microseconds=1) if isinstance(value, datetime) else 0
+
+def _text(value) -> str:
+    # Documents applied straight from a request still hold enum members
+    value = value.value if isinstance(value, Enum) else value
+    return str(value) if value is not None else ""
+
+def _number(value) -> float:
+    return float(value) if isinstance(value, (int, float)) else np.nan
+
+class SnapshotTable:
+    """Immutable column arrays over one version of the active catalog.
+
+    Rows are kept in listing order (newest first), so the default sort needs
+    no sorting at all. Documents are held alongside the columns to render
+    results; filters on anything without a column raise Unsupported.
+    """
+
+    def __init__(self, documents: List[dict]):
+        rows = sorted(documents, key=lambda doc: (_micros(doc.get("created_at")), doc["id"]), reverse=True)
+        geo = [((doc.get("location") or {}).get("geo") or {}).get("coordinates") or [np.nan, np.nan] for doc in rows]
+        self.columns = {
+            "id": np.array([doc["id"] for doc in rows], dtype=str),
+            "created_at": np.array([_micros(doc.get("created_at")) for doc in rows], dtype=np.int64),
+            "price_per_night": np.array([_number(doc.get("price_per_night")) for doc in rows], dtype=np.float64),
+            "rating": np.array([_number(doc.get("rating")) for doc in rows], dtype=np.float64),
+            "max_guests": np.array([_number(doc.get("max_guests")) for doc in rows], dtype=np.float64),
+            "bedrooms": np.array([_number(doc.get("bedrooms")) for doc in rows], dtype=np.float64),
+            "bathrooms": np.array([_number(doc.get("bathrooms")) for doc in rows], dtype=np.float64),
+            "lng": np.radians(np.array([point[0] for point in geo], dtype=np.float64)),
+            "lat": np.radians(np.array([point[1] for point in geo], dtype=np.float64)),
+        }
+        # lexsort needs numbers, so ids sort by their rank
+        self.columns["id_rank"] = np.argsort(np.argsort(self.columns["id"], kind="stable"), kind="stable")
+        # Low-cardinality strings become integer codes into a vocabulary, so
+        # matching compares ints and a prefix is resolved once per vocabulary
+        self.vocabularies = {}
+        for field, values in [
+            ("property_type", [_text(doc.get("property_type")) for doc in rows]),
+            ("city_key", [_text((doc.get("location") or {}).get("city_key")) for doc in rows]),
+        ]:
+            vocabulary, codes = np.unique(np.array(values, dtype=str), return_inverse=True)
+            self.vocabularies[field] = {value: code for code, value in enumerate(vocabulary.tolist())}
+            self.columns[field] = codes.astype(np.int32)
+        self.rows = rows
+
+    def match(self, filter_query: dict) -> np.ndarray:
+        columns = self.columns
+        mask = np.ones(len(self.rows), dtype=bool)
+        for field, condition in filter_query.items():
+            if field == "is_active" and condition is True:
+                continue
+            elif field in ("price_per_night", "max_guests", "bedrooms", "bathrooms"):
+                mask &= self.range_mask(columns[field], condition)
+            elif field == "property_type" and isinstance(condition, str):
+                mask &= columns["property_type"] == self.vocabularies["property_type"].get(condition, -1)
+            elif field == "location.city_key":
+                mask &= self.city_mask(condition)
+            elif field == "location.geo":
+                mask &= self.geo_mask(condition)
+            else:
+                raise Unsupported(field)
+        return mask
+
+    def range_mask(self, column: np.ndarray, condition) -> np.ndarray:
+        if not isinstance(condition, dict):
+            return column == condition
+        mask = np.ones(len(column), dtype=bool)
+        for operator, value in condition.items():
+            if operator == "$gte":
+                mask &= column >= value
+            elif operator == "$lte":
+                mask &= column <= value
+            elif operator == "$gt":
+                mask &= column > value
+            elif operator == "$lt":
+                mask &= column < value
+            else:
+                raise Unsupported(operator)
+        return mask
+
+    def city_mask(self, condition) -> np.ndarray:
+        vocabulary = self.vocabularies["city_key"]
+        if isinstance(condition, str):
+            return self.columns["city_key"] == vocabulary.get(condition, -1)
+        pattern = condition.get("$regex", "") if isinstance(condition, dict) else ""
+        prefix = ESCAPED_CHARACTER.sub(r"\1", pattern[1:])
+        # Only the anchored literal prefixes get_properties builds
+        if len(condition) != 1 or not pattern.startswith("^") or re.escape(prefix) != pattern[1:]:
+            raise Unsupported("location.city_key")
+        codes = [code for key, code in vocabulary.items() if key.startswith(prefix)]
+        return np.isin(self.columns["city_key"], codes)
+
+    def geo_mask(self, condition: dict) -> np.ndarray:
+        within = condition.get("$geoWithin", {}) if isinstance(condition, dict) else {}
+        lat, lng = self.columns["lat"], self.columns["lng"]
+        if "$centerSphere" in within:
+            (center_lng, center_lat), radians = within["$centerSphere"]
+            center_lat, center_lng = np.radians(center_lat), np.radians(center_lng)
+            # Nothing farther in latitude than the radius can match, so the
+            # trigonometry only runs on that band
+            band = np.flatnonzero(np.abs(lat - center_lat) <= radians)
+            # Haversine angular distance, the same sphere $centerSphere measures on
+            a = np.sin((lat[band] - center_lat) / 2) ** 2 + \
+                np.cos(lat[band]) * np.cos(center_lat) * np.sin((lng[band] - center_lng) / 2) ** 2
+            mask = np.zeros(len(lat), dtype=bool)
+            mask[band] = 2 * np.arcsin(np.sqrt(np.minimum(a, 1.0))) <= radians
+            return mask
+        if within.get("$geometry", {}).get("type") == "Polygon":
+            ring = np.radians(np.array(within["$geometry"]["coordinates"][0], dtype=np.float64))
+            return (lng >= ring[:, 0].min()) & (lng <= ring[:, 0].max()) & \
+                   (lat >= ring[:, 1].min()) & (lat <= ring[:, 1].max())
+        raise Unsupported("location.geo")
+
+    def sort_keys(self, sort: List[Tuple[str, int]]) -> List[np.ndarray]:
+        """Ascending numeric keys, one per sort field, for np.lexsort."""
+        keys = []
+        for field, direction in sort:
+            column = self.columns.get("id_rank" if field == "id" else field)
+            if column is None or field not in self.columns:
+                raise Unsupported(field)
+            keys.append(column if direction > 0 else -column)
+        return keys
+
+    def after_mask(self, values: list, sort: List[Tuple[str, int]]) -> np.ndarray:
+        """Rows strictly after the cursor values, mirroring pagination.keyset_filter."""
+        mask = np.zeros(len(self.rows), dtype=bool)
+        equal = np.ones(len(self.rows), dtype=bool)
+        for (field, direction), value in zip(sort, values):
+            column = self.columns[field]
+            if field == "created_at":
+                value = _micros(value)
+            beyond = column > value if direction > 0 else column < value
+            mask |= equal & beyond
+            equal &= column == value
+        return mask
+
+    def search(self, filter_query: dict, sort: List[Tuple[str, int]], after: Optional[list], skip: int,
+               limit: int, count: bool) -> Tuple[List[dict], Optional[int]]:
+        mask = self.match(filter_query)
+        keys = self.sort_keys(sort)
+        total = int(np.count_nonzero(mask)) if count else None
+        if after is not None:
+            mask &= self.after_mask(after, sort)
+
+        matches = np.flatnonzero(mask)
+        # Any order other than the stored one sorts just the matches
+        if sort != NEWEST_FIRST:
+            # lexsort treats its last key as the primary one
+            matches = matches[np.lexsort([key[matches] for key in reversed(keys)])]
+        return [self.rows[row] for row in matches[skip:skip + limit]], total
+
+class PropertySnapshot:
+    """In-process read replica of the active catalog, so listing searches are
+    numpy masks instead of database round trips.
+
+    Changes come from apply() (writes made by this worker) and from polling
+    updated_at (everyone else's). Both are folded into a fresh SnapshotTable
+    by the refresh task off the event loop, so reads may trail writes by up to
+    SNAPSHOT_REFRESH_SECONDS.
+    """
+
+    def __init__(self):
+        self.documents: Dict[str, dict] = {}
+        self.table: Optional[SnapshotTable] = None
+        # Bumped per table so cached listings built from an older one are not reused
+        self.version = 0
+        self.dirty = False
+        self.synced_at: Optional[datetime] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def apply(self, document: dict):
+        """Take in one changed document; inactive properties leave the snapshot."""
+        if self.table is None:
+            return
+        if document.get("is_active"):
+            self.documents[document["id"]] = document
+        else:
+            self.documents.pop(document["id"], None)
+        self.dirty = True
+
+    async def rebuild(self):
+        self.dirty = False
+        # Building takes a while on large catalogs; searches keep using the previous table meanwhile
+        self.table = await asyncio.to_thread(SnapshotTable, list(self.documents.values()))
+        self.version += 1
+
+    async def load(self):
+        started_at = datetime.utcnow()
+        documents = await properties_collection.find({"is_active": True}, {"_id": 0}).to_list(length=None)
+        self.documents = {doc["id"]: doc for doc in documents}
+        await self.rebuild()
+        self.synced_at = started_at
+
+    async def refresh(self):
+        started_at = datetime.utcnow()
+        changed = await properties_collection.find(
+            {"updated_at": {"$gte": self.synced_at - REFRESH_OVERLAP}},
+            {"_id": 0}
+        ).to_list(length=None)
+        for document in changed:
+            self.apply(document)
+        self.synced_at = started_at
+
+    async def run(self):
+        last_full_load = time.monotonic()
+        while True:
+            await asyncio.sleep(SNAPSHOT_REFRESH_SECONDS)
+            try:
+                if time.monotonic() - last_full_load >= SNAPSHOT_FULL_RELOAD_SECONDS:
+                    await self.load()
+                    last_full_load = time.monotonic()
+                else:
+                    await self.refresh()
+                    if self.dirty:
+                        await self.rebuild()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Property snapshot refresh failed; serving the previous snapshot")
+
+    def search(self, filter_query: dict, sort: List[Tuple[str, int]], after: Optional[list], skip: int,
+               limit: int, count: bool) -> Optional[Tuple[List[dict], Optional[int]]]:
+        """One listing page and the filter's total, or None when MongoDB has to answer."""
+        table = self.table
+        if table is None:
+            return None
+        try:
+            return table.search(filter_query, sort, after, skip, limit, count)
+        except Unsupported:
+            return None
+
+property_snapshot = PropertySnapshot()
+
+async def start_snapshot():
+    if PROPERTY_SNAPSHOT:
+        await property_snapshot.load()
+        property_snapshot.task = asyncio.create_task(property_snapshot.run())
+
+async def stop_snapshot():
+    if property_snapshot.task:
+        property_snapshot.task.cancel()
+        property_snapshot.task = None
@@ -0,0 +1,69 @@
+from pymongo import UpdateOne
+from database import messages_collection, conversations_collection, users_collection
+from projections import USER_PROFILE
+from typing import List
+
+# Conversations carry their participants' profiles and their last message so
+# the inbox is one query. Threads created before that was denormalized are
+# filled in on first read and written back, and the migration does the same
+# for all of them; afterwards this is only a fallback.
+
+# Conversations still missing either summary field
+LEGACY_CONVERSATIONS = {"$or": [
+    {"participant_profiles": {"$exists": False}},
+    {"last_message": {"$exists": False}}
+]}
+
+def participant_profile(user: dict) -> dict:
+    return {
+        "id": user["id"],
+        "first_name": user["first_name"],
+        "last_name": user["last_name"],
+        "profile_image": user.get("profile_image")
+    }
+
+async def fill_conversation_summaries(conversations: List[dict]) -> int:
+    """Fill profiles and last messages for conversations created before they
+    were denormalized, and persist them. Returns the conversations written."""
+    updates = {}
+
+    missing_profiles = [conv for conv in conversations if "participant_profiles" not in conv]
+    if missing_profiles:
+        user_ids = list({pid for conv in missing_profiles for pid in conv["participants"]})
+        users = await users_collection.find(
+            {"id": {"$in": user_ids}},
+            USER_PROFILE
+        ).to_list(length=None)
+        profiles = {user["id"]: participant_profile(user) for user in users}
+        for conv in missing_profiles:
+            conv["participant_profiles"] = {
+                pid: profiles[pid] for pid in conv["participants"] if pid in profiles
+            }
+            updates.setdefault(conv["id"], {})["participant_profiles"] = conv["participant_profiles"]
+
+    missing_messages = [conv["id"] for conv in conversations if "last_message" not in conv]
+    if missing_messages:
+        latest = await messages_collection.aggregate([
+            {"$match": {"conversation_id": {"$in": missing_messages}}},
+            {"$sort": {"created_at": -1}},
+            {"$group": {"_id": "$conversation_id", "message": {"$first": "$$ROOT"}}}
+        ]).to_list(length=None)
+        last_messages = {item["_id"]: item["message"] for item in latest}
+        for conv in conversations:
+            if "last_message" not in conv:
+                message = last_messages.get(conv["id"])
+                if message:
+                    message.pop("_id", None)
+                # None for threads without messages, so they are not looked up again
+                conv["last_message"] = message
+                updates.setdefault(conv["id"], {})["last_message"] = message
+
+    if updates:
+        # Each field is only set while still missing, so a message sent or a
+        # profile renamed meanwhile is not overwritten with the older value
+        await conversations_collection.bulk_write([
+            UpdateOne({"id": conversation_id, field: {"$exists": False}}, {"$set": {field: value}})
+            for conversation_id, fields in updates.items()
+            for field, value in fields.items()
+        ], ordered=False)
+    return len(updates)
@@ -1,10 +1,11 @@
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
 MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017/egyptnest")
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
 
 class Database:
     client = None
@@ -12,7 +13,9 @@ class Database:
 
     @classmethod
     def initialize(cls):
-        cls.client = MongoClient(MONGO_URL)
+        # Motor wraps pymongo and runs socket I/O off the event loop, so
+        # every collection call returns an awaitable instead of blocking.
+        cls.client = AsyncIOMotorClient(MONGO_URL, maxPoolSize=MONGO_MAX_POOL_SIZE)
         cls.database = cls.client.egyptnest
 
     @classmethod
@@ -21,6 +24,13 @@ class Database:
             cls.initialize()
         return cls.database[collection_name]
 
+    @classmethod
+    def close(cls):
+        if cls.client is not None:
+            cls.client.close()
+            cls.client = None
+            cls.database = None
+
 # Initialize database connection
 Database.initialize()
 
@@ -29,4 +39,6 @@ users_collection = Database.get_collection("users")
 properties_collection = Database.get_collection("properties")
 bookings_collection = Database.get_collection("bookings")
 messages_collection = Database.get_collection("messages")
-conversations_collection = Database.get_collection("conversations")
\ No newline at end of file
+conversations_collection = Database.get_collection("conversations")
+property_nights_collection = Database.get_collection("property_nights")
+unread_counters_collection = Database.get_collection("unread_counters")
\ No newline at end of file
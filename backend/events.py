@@ -0,0 +1,120 @@
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid
+from database import Database
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+import asyncio
+import logging
+import os
+import uuid
+
+EVENT_BROKER = os.getenv("EVENT_BROKER", "memory")
+EVENT_COLLECTION_SIZE_BYTES = int(os.getenv("EVENT_COLLECTION_SIZE_BYTES", str(64 * 1024 * 1024)))
+RESUME_WINDOW = timedelta(seconds=2)
+RECENT_EVENT_IDS = 10000
+
+logger = logging.getLogger(__name__)
+
+# deliver(event, data, room) pushes one event to the sockets this process holds
+Deliver = Callable[[str, dict, str], Awaitable[None]]
+
+class EventBroker:
+    """Fan real-time events out to every worker process.
+
+    publish() always delivers to the local process first; implementations
+    only have to carry the event to the other workers.
+    """
+
+    def __init__(self):
+        self.deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver):
+        self.deliver = deliver
+
+    async def stop(self):
+        pass
+
+    async def publish(self, event: str, data: dict, room: str):
+        await self.deliver(event, data, room)
+
+class InProcessBroker(EventBroker):
+    """Single-worker deployments: local delivery is all there is."""
+
+class MongoEventBroker(EventBroker):
+    """Relays events between workers through a capped collection.
+
+    Each worker tails the collection with an awaitable cursor and delivers
+    events published by the others. Unlike change streams this works on a
+    standalone mongod, so it needs nothing beyond the database we already run.
+    """
+
+    def __init__(self, collection_name: str = "realtime_events"):
+        super().__init__()
+        self.collection_name = collection_name
+        self.origin = uuid.uuid4().hex
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Deliver):
+        await super().start(deliver)
+        try:
+            await Database.database.create_collection(
+                self.collection_name, capped=True, size=EVENT_COLLECTION_SIZE_BYTES
+            )
+        except CollectionInvalid:
+            pass
+        self.collection = Database.get_collection(self.collection_name)
+
+        # A tailable cursor on an empty collection dies immediately, so make sure it never is
+        started_at = datetime.utcnow()
+        await self.collection.insert_one({"origin": self.origin, "event": None, "published_at": started_at})
+        self.task = asyncio.create_task(self.tail(started_at))
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    async def publish(self, event: str, data: dict, room: str):
+        await super().publish(event, data, room)
+        await self.collection.insert_one({
+            "origin": self.origin,
+            "event": event,
+            "data": data,
+            "room": room,
+            "published_at": datetime.utcnow()
+        })
+
+    async def tail(self, since: datetime):
+        # ObjectIds from different processes are not ordered, so a cursor is
+        # resumed from a publish time slightly in the past and replays are
+        # dropped by remembering recently delivered ids.
+        recent_order = deque()
+        recent_ids = set()
+        while True:
+            try:
+                cursor = self.collection.find(
+                    {"published_at": {"$gte": since}},
+                    cursor_type=CursorType.TAILABLE_AWAIT
+                )
+                while cursor.alive:
+                    async for entry in cursor:
+                        since = max(since, entry["published_at"] - RESUME_WINDOW)
+                        if entry["_id"] in recent_ids:
+                            continue
+                        recent_ids.add(entry["_id"])
+                        recent_order.append(entry["_id"])
+                        if len(recent_order) > RECENT_EVENT_IDS:
+                            recent_ids.discard(recent_order.popleft())
+                        if entry["event"] and entry["origin"] != self.origin:
+                            await self.deliver(entry["event"], entry["data"], entry["room"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Realtime event tail failed; retrying")
+            await asyncio.sleep(0.5)
+
+def create_broker() -> EventBroker:
+    if EVENT_BROKER == "mongo":
+        return MongoEventBroker()
+    return InProcessBroker()
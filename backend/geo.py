@@ -0,0 +1,63 @@
+from typing import Any, Optional, Tuple
+
+EARTH_RADIUS_KM = 6378.1
+
+def parse_lat_lng(coordinates: Any) -> Optional[Tuple[float, float]]:
+    """Read (lat, lng) from the coordinate shapes clients send.
+
+    Accepts {"lat", "lng"}, {"latitude", "longitude"} and GeoJSON points
+    ({"type": "Point", "coordinates": [lng, lat]}).
+    """
+    if not isinstance(coordinates, dict):
+        return None
+
+    # Malformed shapes must surface as ValueError; pydantic turns that into a 422
+    # but lets TypeError escape as a 500
+    try:
+        if coordinates.get("type") == "Point":
+            lng, lat = coordinates.get("coordinates", [None, None])[:2]
+        else:
+            lat = coordinates.get("lat", coordinates.get("latitude"))
+            lng = coordinates.get("lng", coordinates.get("longitude"))
+
+        if lat is None or lng is None:
+            return None
+
+        lat, lng = float(lat), float(lng)
+    except (TypeError, IndexError) as error:
+        raise ValueError("coordinates must be numbers") from error
+    check_lat_lng(lat, lng)
+    return lat, lng
+
+def check_lat_lng(lat: float, lng: float):
+    # NaN fails every comparison, so it is rejected along with infinities
+    if not -90 <= lat <= 90 or not -180 <= lng <= 180:
+        raise ValueError("coordinates out of range")
+
+def check_bbox(min_lng: float, min_lat: float, max_lng: float, max_lat: float):
+    check_lat_lng(min_lat, min_lng)
+    check_lat_lng(max_lat, max_lng)
+    if not min_lng < max_lng or not min_lat < max_lat:
+        raise ValueError("minimums must be below maximums")
+
+def geojson_point(lat: float, lng: float) -> dict:
+    return {"type": "Point", "coordinates": [lng, lat]}
+
+def with_geojson_point(location: dict) -> dict:
+    """Return `location` with a GeoJSON `geo` point derived from its coordinates."""
+    lat_lng = parse_lat_lng(location.get("coordinates"))
+    if lat_lng is None:
+        return location
+    return {**location, "geo": geojson_point(*lat_lng)}
+
+def within_radius(lat: float, lng: float, radius_km: float) -> dict:
+    return {"$geoWithin": {"$centerSphere": [[lng, lat], radius_km / EARTH_RADIUS_KM]}}
+
+def within_bbox(min_lng: float, min_lat: float, max_lng: float, max_lat: float) -> dict:
+    return {"$geoWithin": {"$geometry": {
+        "type": "Polygon",
+        "coordinates": [[
+            [min_lng, min_lat], [max_lng, min_lat], [max_lng, max_lat],
+            [min_lng, max_lat], [min_lng, min_lat]
+        ]]
+    }}}
@@ -0,0 +1,185 @@
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, IndexModel
+from database import Database
+from sorts import LISTING_SORTS
+import asyncio
+import sys
+
+# Every index the API relies on, grouped by collection. create_indexes is a
+# no-op for indexes that already exist with the same spec, so this is safe to
+# apply on every startup.
+INDEXES = {
+    "users": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("email", ASCENDING)], unique=True),
+    ],
+    "properties": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("host_id", ASCENDING)]),
+        # One pair per listing sort: equality fields, then the sort keys, then
+        # the price range, so filtered pages are read in order without a SORT
+        IndexModel([("is_active", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("is_active", ASCENDING), ("property_type", ASCENDING), ("created_at", DESCENDING),
+                    ("id", DESCENDING), ("price_per_night", ASCENDING)]),
+        IndexModel([("is_active", ASCENDING), ("price_per_night", ASCENDING), ("id", ASCENDING)]),
+        IndexModel([("is_active", ASCENDING), ("property_type", ASCENDING), ("price_per_night", ASCENDING),
+                    ("id", ASCENDING)]),
+        IndexModel([("is_active", ASCENDING), ("rating", DESCENDING), ("id", DESCENDING), ("price_per_night", ASCENDING)]),
+        IndexModel([("is_active", ASCENDING), ("property_type", ASCENDING), ("rating", DESCENDING),
+                    ("id", DESCENDING), ("price_per_night", ASCENDING)]),
+        IndexModel([("location.geo", GEOSPHERE), ("is_active", ASCENDING)]),
+        IndexModel([("location.city_key", ASCENDING), ("is_active", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("amenities", ASCENDING), ("is_active", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("updated_at", ASCENDING)]),
+    ],
+    "bookings": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("guest_id", ASCENDING), ("check_in", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("guest_id", ASCENDING), ("status", ASCENDING), ("check_in", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("property_id", ASCENDING), ("check_in", ASCENDING)]),
+    ],
+    "property_nights": [
+        IndexModel([("property_id", ASCENDING), ("night", ASCENDING)], unique=True),
+        IndexModel([("booking_id", ASCENDING)]),
+    ],
+    "unread_counters": [
+        IndexModel([("user_id", ASCENDING)], unique=True),
+    ],
+    "messages": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("conversation_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)]),
+    ],
+    "conversations": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("participants", ASCENDING), ("updated_at", DESCENDING)]),
+    ],
+}
+
+# Every listing sort with the type and price filters it is indexed for;
+# these must come back in index order, without an in-memory SORT stage
+LISTING_SHAPES = [
+    ("properties", query, sort)
+    for sort in LISTING_SORTS.values()
+    for query in [
+        {"is_active": True},
+        {"is_active": True, "property_type": "villa"},
+        {"is_active": True, "price_per_night": {"$gte": 100, "$lte": 500}},
+        {"is_active": True, "property_type": "villa", "price_per_night": {"$gte": 100, "$lte": 500}},
+    ]
+]
+
+# Representative filters (and sorts) for every query issued by routes/*.py.
+# Values are placeholders; only the shape matters to the planner.
+QUERY_SHAPES = [
+    ("users", {"id": "user-id"}, None),
+    ("users", {"email": "guest@example.com"}, None),
+    ("users", {"id": {"$in": ["user-id"]}}, None),
+    ("properties", {"id": "property-id"}, None),
+    ("properties", {"host_id": "host-id"}, None),
+    *LISTING_SHAPES,
+    ("properties", {"is_active": True, "location.city_key": "cairo"},
+     [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("properties", {"is_active": True, "location.city_key": {"$regex": "^alex"}},
+     [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("properties", {"is_active": True, "amenities": {"$all": ["pool", "wifi"]}},
+     [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("properties", {"is_active": True, "location.geo": {"$geoWithin": {"$centerSphere": [[31.2357, 30.0444], 0.001]}}},
+     [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("properties", {"updated_at": {"$gte": "2025-01-01"}}, None),
+    ("bookings", {"id": "booking-id"}, None),
+    ("bookings", {"guest_id": "guest-id"}, [("check_in", DESCENDING), ("id", DESCENDING)]),
+    ("bookings", {"guest_id": "guest-id", "status": "confirmed", "check_in": {"$gte": "2025-01-01"}},
+     [("check_in", DESCENDING), ("id", DESCENDING)]),
+    ("bookings", {"property_id": {"$in": ["property-id"]}}, None),
+    ("property_nights", {"booking_id": "booking-id"}, None),
+    ("property_nights", {"property_id": "property-id", "night": {"$gte": "2025-01-01", "$lte": "2025-01-04"}}, None),
+    ("messages", {"id": "message-id"}, None),
+    ("messages", {"conversation_id": "conversation-id"}, [("created_at", DESCENDING), ("id", DESCENDING)]),
+    ("messages", {"$and": [{"conversation_id": "conversation-id"}, {"$or": [
+        {"created_at": {"$gt": "2025-01-01"}},
+        {"created_at": "2025-01-01", "id": {"$gt": "message-id"}}
+    ]}]}, [("created_at", ASCENDING), ("id", ASCENDING)]),
+    ("messages", {"conversation_id": {"$in": ["conversation-id"]}}, [("created_at", DESCENDING)]),
+    ("messages", {"conversation_id": "conversation-id", "is_read": False, "sender_id": {"$ne": "user-id"},
+                  "created_at": {"$lte": "2025-01-01"}}, None),
+    ("unread_counters", {"user_id": "user-id"}, None),
+    ("conversations", {"id": "conversation-id"}, None),
+    ("conversations", {"participants": ["user-a", "user-b"], "property_id": "property-id"}, None),
+    ("conversations", {"participants": "user-id"}, [("updated_at", DESCENDING)]),
+    ("conversations", {"participants": "user-id", "participant_profiles": {"$exists": True}}, None),
+]
+
+async def ensure_indexes():
+    for collection_name, indexes in INDEXES.items():
+        await Database.get_collection(collection_name).create_indexes(indexes)
+
+def plan_stages(plan: dict):
+    """Yield every stage name in an explain() plan tree."""
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+async def find_plans_with(stage: str, shapes: list):
+    """Return the query shapes whose winning plan contains `stage`."""
+    offenders = []
+    for collection_name, query, sort in shapes:
+        cursor = Database.get_collection(collection_name).find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explanation = await cursor.explain()
+        winning_plan = explanation["queryPlanner"]["winningPlan"]
+        if stage in plan_stages(winning_plan):
+            offenders.append((collection_name, query, sort))
+    return offenders
+
+async def find_collection_scans():
+    return await find_plans_with("COLLSCAN", QUERY_SHAPES)
+
+async def find_blocking_sorts():
+    """Listing shapes whose pages are sorted in memory instead of read in index order."""
+    return await find_plans_with("SORT", LISTING_SHAPES)
+
+async def find_stale_indexes():
+    """Indexes on registry collections that INDEXES no longer declares.
+
+    They still cost every write and memory, e.g. the ones left behind when a
+    listing or message index was replaced by a wider one.
+    """
+    stale = []
+    for collection_name, indexes in INDEXES.items():
+        declared = {index.document["name"] for index in indexes}
+        existing = await Database.get_collection(collection_name).index_information()
+        for name, spec in existing.items():
+            if name != "_id_" and name not in declared:
+                stale.append((collection_name, name, spec["key"]))
+    return stale
+
+async def drop_stale_indexes():
+    stale = await find_stale_indexes()
+    for collection_name, name, key in stale:
+        await Database.get_collection(collection_name).drop_index(name)
+    return stale
+
+async def verify_indexes(drop_stale: bool = False):
+    await ensure_indexes()
+    if drop_stale:
+        for collection_name, name, key in await drop_stale_indexes():
+            print(f"Dropped stale index {name} on {collection_name}: key={key}")
+    stale = await find_stale_indexes()
+    for collection_name, name, key in stale:
+        print(f"Stale index {name} on {collection_name}: key={key} (drop with --drop-stale)")
+    scans = await find_collection_scans()
+    for collection_name, query, sort in scans:
+        print(f"COLLSCAN on {collection_name}: filter={query} sort={sort}")
+    sorts = await find_blocking_sorts()
+    for collection_name, query, sort in sorts:
+        print(f"In-memory SORT on {collection_name}: filter={query} sort={sort}")
+    print(f"{len(QUERY_SHAPES) - len(scans)}/{len(QUERY_SHAPES)} query shapes use an index, "
+          f"{len(LISTING_SHAPES) - len(sorts)}/{len(LISTING_SHAPES)} listing sorts without an in-memory sort, "
+          f"{len(stale)} stale indexes")
+    return not scans and not sorts and not stale
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(verify_indexes(drop_stale="--drop-stale" in sys.argv)) else 1)
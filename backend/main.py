@@ -4,16 +4,20 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
 from dotenv import load_dotenv
+import socketio
 import uvicorn
 
 # Load environment variables
 load_dotenv()
 
+from responses import FastJSONResponse
+
 # Create FastAPI app
 app = FastAPI(
     title="EgyptNest API",
     description="A comprehensive Airbnb-like platform API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Configure CORS
@@ -30,6 +34,7 @@ security = HTTPBearer()
 
 # Import routers
 from routes import auth, users, properties, bookings, messages
+from auth import token_cache
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
@@ -38,13 +43,51 @@ app.include_router(properties.router, prefix="/api/properties", tags=["propertie
 app.include_router(bookings.router, prefix="/api/bookings", tags=["bookings"])
 app.include_router(messages.router, prefix="/api/messages", tags=["messages"])
 
+@app.on_event("startup")
+async def create_indexes():
+    from indexes import ensure_indexes
+    await ensure_indexes()
+
+@app.on_event("startup")
+async def start_realtime_broker():
+    from realtime import start_broker
+    await start_broker()
+
+@app.on_event("startup")
+async def start_property_snapshot():
+    from catalog import start_snapshot
+    await start_snapshot()
+
+@app.on_event("shutdown")
+async def shutdown_db_client():
+    from database import Database
+    from auth import password_executor
+    from realtime import stop_broker
+    from catalog import stop_snapshot
+    await stop_broker()
+    await stop_snapshot()
+    Database.close()
+    password_executor.shutdown(wait=False)
+
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy", "message": "EgyptNest API is running"}
 
+@app.get("/api/metrics/cache")
+async def cache_metrics():
+    return {
+        "users": auth.user_cache.stats(),
+        "tokens": token_cache.stats(),
+        "property_responses": properties.response_cache.stats()
+    }
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to EgyptNest API"}
 
+# Socket.IO shares the ASGI entrypoint and hands every other request to FastAPI
+from realtime import sio
+app = socketio.ASGIApp(sio, other_asgi_app=app)
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8001, reload=True)
\ No newline at end of file
@@ -0,0 +1,136 @@
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from database import (
+    bookings_collection, properties_collection, property_nights_collection,
+    messages_collection, conversations_collection, unread_counters_collection
+)
+from availability import ACTIVE_BOOKING_STATUSES, booking_nights
+from geo import with_geojson_point
+from normalization import with_city_key
+from conversations import LEGACY_CONVERSATIONS, fill_conversation_summaries
+import asyncio
+
+BATCH_SIZE = 1000
+
+async def backfill_property_locations():
+    """Add city_key and the GeoJSON point to properties written before they existed."""
+    updated = 0
+    cursor = properties_collection.find(
+        {"$or": [{"location.city_key": {"$exists": False}}, {"location.geo": {"$exists": False}}]},
+        {"_id": 0, "id": 1, "location": 1}
+    )
+    batch = []
+    async for property_doc in cursor:
+        location = property_doc.get("location") or {}
+        try:
+            normalized = with_city_key(with_geojson_point(location))
+        except (TypeError, ValueError):
+            # Leave unparseable coordinates alone rather than abort the run
+            normalized = with_city_key(location)
+        if normalized != location:
+            batch.append(UpdateOne({"id": property_doc["id"]}, {"$set": {"location": normalized}}))
+        if len(batch) >= BATCH_SIZE:
+            await properties_collection.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+    if batch:
+        await properties_collection.bulk_write(batch, ordered=False)
+        updated += len(batch)
+    return updated
+
+async def backfill_booking_nights():
+    """Reserve calendar nights for active bookings created before the calendar existed."""
+    reserved = set(await property_nights_collection.distinct("booking_id"))
+    cursor = bookings_collection.find(
+        {"status": {"$in": ACTIVE_BOOKING_STATUSES}},
+        {"_id": 0, "id": 1, "property_id": 1, "check_in": 1, "check_out": 1}
+    ).sort("created_at", 1)
+    inserted = 0
+    batch = []
+    async def flush():
+        nonlocal inserted
+        try:
+            result = await property_nights_collection.bulk_write(batch, ordered=False)
+            inserted += result.inserted_count
+        except BulkWriteError as error:
+            # Legacy overlaps: the earliest booking keeps the night
+            inserted += error.details["nInserted"]
+            print(f"backfill_booking_nights: {len(error.details['writeErrors'])} nights already taken")
+    async for booking in cursor:
+        if booking["id"] in reserved:
+            continue
+        for night in booking_nights(booking["check_in"], booking["check_out"]):
+            batch.append(InsertOne({"property_id": booking["property_id"], "night": night, "booking_id": booking["id"]}))
+        if len(batch) >= BATCH_SIZE:
+            await flush()
+            batch = []
+    if batch:
+        await flush()
+    return inserted
+
+async def backfill_unread_counters():
+    """Rebuild every user's unread counters from the messages still marked unread."""
+    unread = await messages_collection.aggregate([
+        {"$match": {"is_read": False}},
+        {"$group": {"_id": {"conversation_id": "$conversation_id", "sender_id": "$sender_id"}, "count": {"$sum": 1}}}
+    ]).to_list(length=None)
+    conversation_ids = list({group["_id"]["conversation_id"] for group in unread})
+    participants = {
+        conv["id"]: conv["participants"]
+        async for conv in conversations_collection.find(
+            {"id": {"$in": conversation_ids}}, {"_id": 0, "id": 1, "participants": 1}
+        )
+    }
+    
+    # A message is unread for every participant except its sender
+    counters = {}
+    for group in unread:
+        conversation_id = group["_id"]["conversation_id"]
+        for user_id in participants.get(conversation_id, []):
+            if user_id == group["_id"]["sender_id"]:
+                continue
+            conversations = counters.setdefault(user_id, {})
+            conversations[conversation_id] = conversations.get(conversation_id, 0) + group["count"]
+    
+    batch = [
+        UpdateOne(
+            {"user_id": user_id},
+            {"$set": {"total": sum(conversations.values()), "conversations": conversations}},
+            upsert=True
+        )
+        for user_id, conversations in counters.items()
+    ]
+    for offset in range(0, len(batch), BATCH_SIZE):
+        await unread_counters_collection.bulk_write(batch[offset:offset + BATCH_SIZE], ordered=False)
+    # Counters for users with nothing unread left
+    await unread_counters_collection.update_many(
+        {"user_id": {"$nin": list(counters)}},
+        {"$set": {"total": 0, "conversations": {}}}
+    )
+    return len(batch)
+
+async def backfill_conversation_summaries():
+    """Persist participant profiles and last messages on conversations created
+    before they were denormalized, so the inbox stops rebuilding them."""
+    updated = 0
+    while True:
+        # Each pass writes both fields, so the filter shrinks until nothing is left
+        batch = await conversations_collection.find(LEGACY_CONVERSATIONS, {"_id": 0}).to_list(length=BATCH_SIZE)
+        if not batch:
+            return updated
+        updated += await fill_conversation_summaries(batch)
+
+MIGRATIONS = [
+    backfill_property_locations,
+    backfill_booking_nights,
+    backfill_unread_counters,
+    backfill_conversation_summaries,
+]
+
+async def run_migrations():
+    for migration in MIGRATIONS:
+        updated = await migration()
+        print(f"{migration.__name__}: {updated} documents updated")
+
+if __name__ == "__main__":
+    asyncio.run(run_migrations())
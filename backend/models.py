@@ -2,6 +2,8 @@ from pydantic import BaseModel, EmailStr, validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
+from geo import with_geojson_point
+from normalization import with_city_key
 import uuid
 
 class UserType(str, Enum):
@@ -61,6 +63,11 @@ class PropertyBase(BaseModel):
     bedrooms: int
     bathrooms: int
 
+    @validator("location")
+    def normalize_location(cls, location):
+        # Derived fields stored alongside the raw values for indexed search
+        return with_city_key(with_geojson_point(location))
+
 class PropertyCreate(PropertyBase):
     host_id: str
 
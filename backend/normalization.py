@@ -0,0 +1,67 @@
+import re
+import unicodedata
+
+# Arabic diacritics (tashkeel), superscript alef and tatweel
+ARABIC_MARKS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+
+ARABIC_LETTER_VARIANTS = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ة": "ه", "ى": "ي", "ؤ": "و", "ئ": "ي",
+})
+
+# Letter-by-letter fallback for Arabic names missing from CITY_ALIASES
+ARABIC_TO_LATIN = str.maketrans({
+    "ا": "a", "ب": "b", "ت": "t", "ث": "th", "ج": "g", "ح": "h", "خ": "kh",
+    "د": "d", "ذ": "z", "ر": "r", "ز": "z", "س": "s", "ش": "sh", "ص": "s",
+    "ض": "d", "ط": "t", "ظ": "z", "ع": "a", "غ": "gh", "ف": "f", "ق": "q",
+    "ك": "k", "ل": "l", "م": "m", "ن": "n", "ه": "h", "و": "w", "ي": "y",
+    "ء": "",
+})
+
+# Canonical keys for cities whose Arabic and Latin spellings diverge.
+# Aliases are written in already-normalized form.
+CITY_ALIASES = {
+    "cairo": ["القاهره", "al qahirah", "el qahira", "qahira", "kairo", "le caire"],
+    "alexandria": ["الاسكندريه", "alexandrie", "alex", "iskandariya", "el iskandariya", "al iskandariyah"],
+    "giza": ["الجيزه", "gizeh", "el giza", "al jizah", "giza"],
+    "luxor": ["الاقصر", "al uqsur", "el uqsor", "louxor"],
+    "aswan": ["اسوان", "assuan", "assouan"],
+    "hurghada": ["الغردقه", "al ghardaqah", "el ghardaqa"],
+    "sharm el sheikh": ["شرم الشيخ", "sharm", "sharm al shaykh", "sharm el-sheikh", "sharm elsheikh"],
+    "dahab": ["دهب"],
+    "port said": ["بورسعيد", "بور سعيد", "bur said"],
+    "suez": ["السويس", "as suways", "el suweis"],
+    "mansoura": ["المنصوره", "al mansurah", "el mansoura"],
+    "tanta": ["طنطا"],
+    "marsa alam": ["مرسي علم", "مرسى علم"],
+    "siwa": ["سيوه", "siwa oasis"],
+    "ain sokhna": ["العين السخنه", "ain el sokhna", "el sokhna", "sokhna"],
+    "north coast": ["الساحل الشمالي", "sahel", "el sahel"],
+}
+
+def _fold(value: str) -> str:
+    value = unicodedata.normalize("NFKD", value.casefold())
+    value = "".join(char for char in value if not unicodedata.combining(char))
+    value = ARABIC_MARKS.sub("", value).translate(ARABIC_LETTER_VARIANTS)
+    value = re.sub(r"[-_'’.,]+", " ", value)
+    return re.sub(r"\s+", " ", value).strip()
+
+CITY_KEYS = {_fold(alias): key for key, aliases in CITY_ALIASES.items() for alias in aliases + [key]}
+
+def city_key(name: str) -> str:
+    """Normalized, index-friendly key for a city name in Arabic or Latin script.
+
+    Casefolds, strips Latin diacritics and Arabic tashkeel, unifies letter
+    variants, maps known aliases to one canonical key and transliterates any
+    remaining Arabic letters.
+    """
+    folded = _fold(name)
+    if folded in CITY_KEYS:
+        return CITY_KEYS[folded]
+    return folded.translate(ARABIC_TO_LATIN)
+
+def with_city_key(location: dict) -> dict:
+    """Return `location` with `city_key` derived from its city name."""
+    if not location.get("city"):
+        return location
+    return {**location, "city_key": city_key(str(location["city"]))}
@@ -0,0 +1,49 @@
+from fastapi import HTTPException, status
+from datetime import datetime
+from typing import Any, List, Tuple
+import base64
+import json
+
+# Cursors are opaque to clients: a urlsafe base64 JSON list holding the sort
+# key values of the last document on the previous page.
+
+def _encode_value(value: Any):
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return value
+
+def _decode_value(value: Any):
+    if isinstance(value, dict) and "$date" in value:
+        return datetime.fromisoformat(value["$date"])
+    return value
+
+def encode_cursor(document: dict, sort: List[Tuple[str, int]]) -> str:
+    values = [_encode_value(document.get(field)) for field, _ in sort]
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: List[Tuple[str, int]]) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(sort):
+            raise ValueError("cursor does not match sort")
+        return [_decode_value(value) for value in values]
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+def keyset_filter(values: list, sort: List[Tuple[str, int]]) -> dict:
+    """Match documents strictly after `values` in `sort` order.
+
+    For sort [(a, 1), (b, 1)] this expands to
+    {"$or": [{a: {"$gt": va}}, {a: va, b: {"$gt": vb}}]}.
+    """
+    clauses = []
+    for position, (field, direction) in enumerate(sort):
+        clause = {prior: values[index] for index, (prior, _) in enumerate(sort[:position])}
+        clause[field] = {"$gt" if direction > 0 else "$lt": values[position]}
+        clauses.append(clause)
+    return {"$or": clauses}
@@ -0,0 +1,70 @@
+from typing import Any
+
+# Each query names the fields its response reads, so password hashes, long
+# descriptions and image galleries stay in the database unless asked for.
+
+def fields(*names: str, **expressions: Any) -> dict:
+    projection = {"_id": 0}
+    projection.update({name: 1 for name in names})
+    projection.update(expressions)
+    return projection
+
+# Everything request handlers read from the authenticated user; never the password hash
+USER_SESSION = fields(
+    "id", "email", "first_name", "last_name", "phone", "user_type",
+    "profile_image", "is_verified", "created_at", "updated_at"
+)
+USER_PUBLIC = fields("id", "first_name", "last_name", "user_type", "profile_image", "is_verified")
+USER_PROFILE = fields("id", "first_name", "last_name", "profile_image")
+
+PROPERTY_FULL = fields()
+# Listing cards: no description or amenities and only the cover image;
+# created_at and id stay because listing cursors are built from them
+PROPERTY_SUMMARY = fields(
+    "id", "title", "property_type", "price_per_night", "location.city", "location.country",
+    "location.coordinates", "max_guests", "bedrooms", "bathrooms", "rating", "review_count",
+    "created_at", images={"$slice": 1}
+)
+# What a booking shows about the property it is for
+PROPERTY_CARD = fields("id", "title", "location", images={"$slice": 1})
+# Booking writes only check the property exists and who hosts it
+PROPERTY_OWNER = fields("id", "host_id")
+
+PROPERTY_VIEWS = {"summary": PROPERTY_SUMMARY, "full": PROPERTY_FULL}
+
+def project(document: dict, projection: dict) -> dict:
+    """Apply one of the projections above to a document already in memory."""
+    tree = {}
+    for path, spec in projection.items():
+        if path == "_id":
+            continue
+        *parents, leaf = path.split(".")
+        node = tree
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[leaf] = spec
+    if not tree:
+        return {key: value for key, value in document.items() if key != "_id"}
+    return _project(document, tree)
+
+def _project(document: dict, tree: dict) -> dict:
+    result = {}
+    for key, value in document.items():
+        spec = tree.get(key)
+        if spec is None:
+            continue
+        if isinstance(spec, dict) and "$slice" in spec:
+            result[key] = value[:spec["$slice"]] if isinstance(value, list) else value
+        elif isinstance(spec, dict):
+            if isinstance(value, dict):
+                result[key] = _project(value, spec)
+        else:
+            result[key] = value
+    return result
+
+def pipeline_projection(projection: dict) -> dict:
+    """The same projection as a $project stage, where $slice names the array it cuts."""
+    return {
+        path: {"$slice": [f"${path}", spec["$slice"]]} if isinstance(spec, dict) and "$slice" in spec else spec
+        for path, spec in projection.items()
+    }
@@ -0,0 +1,102 @@
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from auth import verify_token
+from database import conversations_collection
+from events import create_broker
+from socketio.exceptions import ConnectionRefusedError
+from datetime import datetime
+from typing import Optional
+import socketio
+
+# Rooms: "user:<id>" for a user's inbox updates on every connection they
+# hold, "conversation:<id>" for the message stream of an open thread.
+sio = socketio.AsyncServer(
+    async_mode="asgi",
+    cors_allowed_origins=["http://localhost:3000"],
+)
+
+# Events go through the broker so sockets held by other workers receive them too
+broker = create_broker()
+
+async def deliver(event: str, data: dict, room: str):
+    await sio.emit(event, data, room=room)
+
+async def start_broker():
+    await broker.start(deliver)
+
+async def stop_broker():
+    await broker.stop()
+
+def user_room(user_id: str) -> str:
+    return f"user:{user_id}"
+
+def conversation_room(conversation_id: str) -> str:
+    return f"conversation:{conversation_id}"
+
+def token_from_handshake(environ: dict, auth) -> str:
+    if isinstance(auth, dict) and auth.get("token"):
+        return auth["token"]
+    header = environ.get("HTTP_AUTHORIZATION", "")
+    if header.lower().startswith("bearer "):
+        return header[7:]
+    return ""
+
+@sio.event
+async def connect(sid, environ, auth=None):
+    try:
+        user_id = verify_token(token_from_handshake(environ, auth))
+    except HTTPException:
+        raise ConnectionRefusedError("Invalid authentication credentials")
+
+    await sio.save_session(sid, {"user_id": user_id})
+    await sio.enter_room(sid, user_room(user_id))
+
+@sio.event
+async def join_conversation(sid, data):
+    session = await sio.get_session(sid)
+    conversation_id = (data or {}).get("conversation_id")
+    conversation = await conversations_collection.find_one(
+        {"id": conversation_id},
+        {"_id": 0, "participants": 1}
+    )
+    if not conversation or session["user_id"] not in conversation["participants"]:
+        return {"error": "You are not a participant in this conversation"}
+
+    await sio.enter_room(sid, conversation_room(conversation_id))
+    return {"conversation_id": conversation_id}
+
+@sio.event
+async def leave_conversation(sid, data):
+    conversation_id = (data or {}).get("conversation_id")
+    await sio.leave_room(sid, conversation_room(conversation_id))
+    return {"conversation_id": conversation_id}
+
+async def publish_message(conversation: dict, message: dict):
+    """Push a new message to the open thread and refresh each participant's inbox."""
+    payload = jsonable_encoder(message)
+    await broker.publish("new_message", payload, conversation_room(conversation["id"]))
+    for participant_id in conversation["participants"]:
+        await broker.publish(
+            "conversation_updated",
+            {"conversation_id": conversation["id"], "last_message": payload},
+            user_room(participant_id)
+        )
+
+async def publish_read_receipt(conversation_id: str, reader_id: str, message_ids: Optional[list] = None,
+                               up_to: Optional[datetime] = None):
+    """Tell the thread which messages were read: explicit ids, or everything up to a time."""
+    await broker.publish(
+        "messages_read",
+        jsonable_encoder({
+            "conversation_id": conversation_id,
+            "reader_id": reader_id,
+            "message_ids": message_ids,
+            "up_to": up_to
+        }),
+        conversation_room(conversation_id)
+    )
+
+async def publish_booking_update(booking: dict, host_id: str, booking_status: str):
+    payload = {"booking_id": booking["id"], "property_id": booking["property_id"], "status": booking_status}
+    for user_id in (booking["guest_id"], host_id):
+        await broker.publish("booking_updated", payload, user_room(user_id))
@@ -0,0 +1,40 @@
+from fastapi import Request, Response
+from cache import CacheBackend
+from responses import dumps
+from typing import Any, Awaitable, Callable, Hashable
+import hashlib
+
+class ResponseCache:
+    """Caches serialized JSON bodies with a strong ETag.
+
+    Hits skip both the database and serialization, and clients that send a
+    matching If-None-Match get an empty 304. Responses are marked no-cache,
+    so clients keep the body but revalidate it on every use and see writes
+    as soon as the server-side entry is invalidated.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    def serialize(self, payload: Any) -> bytes:
+        return dumps(payload)
+
+    async def respond(self, request: Request, key: Hashable, build: Callable[[], Awaitable[Any]]) -> Response:
+        entry = self.backend.get(key)
+        if entry is None:
+            body = self.serialize(await build())
+            entry = (body, f'"{hashlib.sha1(body).hexdigest()}"')
+            self.backend.set(key, entry)
+
+        body, etag = entry
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def invalidate(self):
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        return self.backend.stats()
@@ -0,0 +1,20 @@
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from typing import Any
+import orjson
+
+# orjson writes datetimes, enums and dataclasses natively, so large lists of
+# raw Mongo documents skip jsonable_encoder's per-value walk. Naive datetimes
+# keep the isoformat jsonable_encoder produced, so clients see no change.
+DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+def dumps(content: Any) -> bytes:
+    # Anything orjson does not know (pydantic models, ObjectIds, sets) falls back to jsonable_encoder
+    return orjson.dumps(content, default=jsonable_encoder, option=DUMPS_OPTIONS)
+
+class FastJSONResponse(ORJSONResponse):
+    """Default response class. Handlers returning it directly also bypass
+    response_model validation, which is worth it for 100+ item lists."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
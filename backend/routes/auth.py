@@ -2,16 +2,25 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from models import UserCreate, UserLogin, UserResponse, Token
 from database import users_collection
-from auth import get_password_hash, verify_password, create_access_token, verify_token, generate_uuid
+from auth import get_password_hash_async, verify_password_async, create_access_token, verify_token, generate_uuid
+from cache import TTLCache
+from projections import USER_SESSION
 from datetime import datetime
+import os
 
 router = APIRouter()
 security = HTTPBearer()
 
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+
+# Authenticated users keyed by id; profile writes must call user_cache.invalidate
+user_cache = TTLCache(maxsize=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+
 @router.post("/register", response_model=dict)
 async def register(user: UserCreate):
     # Check if user already exists
-    existing_user = users_collection.find_one({"email": user.email})
+    existing_user = await users_collection.find_one({"email": user.email})
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -20,7 +29,7 @@ async def register(user: UserCreate):
     
     # Create new user
     user_id = generate_uuid()
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     
     user_data = {
         "id": user_id,
@@ -36,7 +45,7 @@ async def register(user: UserCreate):
         "updated_at": datetime.utcnow()
     }
     
-    users_collection.insert_one(user_data)
+    await users_collection.insert_one(user_data)
     
     # Create access token
     access_token = create_access_token(data={"sub": user_id})
@@ -56,9 +65,9 @@ async def register(user: UserCreate):
 
 @router.post("/login", response_model=dict)
 async def login(user_credentials: UserLogin):
-    user = users_collection.find_one({"email": user_credentials.email})
+    user = await users_collection.find_one({"email": user_credentials.email})
     
-    if not user or not verify_password(user_credentials.password, user["hashed_password"]):
+    if not user or not await verify_password_async(user_credentials.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -81,13 +90,17 @@ async def login(user_credentials: UserLogin):
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     user_id = verify_token(credentials.credentials)
-    user = users_collection.find_one({"id": user_id})
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    return user
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await users_collection.find_one({"id": user_id}, USER_SESSION)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        user_cache.set(user_id, user)
+    # Hand out a copy so a handler can never mutate the cached document
+    return dict(user)
 
 @router.get("/me", response_model=dict)
 async def get_current_user_info(current_user: dict = Depends(get_current_user)):
@@ -1,38 +1,46 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 from models import BookingCreate, BookingResponse, BookingStatus
-from database import bookings_collection, properties_collection
+from database import bookings_collection, properties_collection, users_collection
 from routes.auth import get_current_user
+from realtime import publish_booking_update
+from pagination import encode_cursor, decode_cursor, keyset_filter
+from projections import PROPERTY_CARD, PROPERTY_OWNER
+from responses import FastJSONResponse
+from availability import ACTIVE_BOOKING_STATUSES, booking_nights, reserve_nights, release_nights
 from datetime import datetime
+from typing import Optional
 
 router = APIRouter()
 
+# Latest trips first; id breaks ties between bookings with the same check-in
+TRIP_SORT = [("check_in", -1), ("id", -1)]
+
 @router.post("/", response_model=dict)
 async def create_booking(booking_data: BookingCreate, current_user: dict = Depends(get_current_user)):
     # Verify property exists
-    property_doc = properties_collection.find_one({"id": booking_data.property_id})
+    property_doc = await properties_collection.find_one({"id": booking_data.property_id}, PROPERTY_OWNER)
     if not property_doc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Property not found"
         )
     
-    # Check if property is available for the dates
-    existing_bookings = bookings_collection.find({
-        "property_id": booking_data.property_id,
-        "status": {"$in": ["confirmed", "pending"]},
-        "check_out": {"$gt": booking_data.check_in},
-        "check_in": {"$lt": booking_data.check_out}
-    })
-    
-    if list(existing_bookings):
+    if not booking_nights(booking_data.check_in, booking_data.check_out):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Property is not available for the selected dates"
+            detail="Check-out must be at least one night after check-in"
         )
     
     from auth import generate_uuid
     booking_id = generate_uuid()
     
+    # Claim the nights first; the unique calendar index makes this the availability check
+    if not await reserve_nights(booking_data.property_id, booking_id, booking_data.check_in, booking_data.check_out):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Property is not available for the selected dates"
+        )
+    
     booking_doc = {
         "id": booking_id,
         "property_id": booking_data.property_id,
@@ -46,7 +54,11 @@ async def create_booking(booking_data: BookingCreate, current_user: dict = Depen
         "updated_at": datetime.utcnow()
     }
     
-    bookings_collection.insert_one(booking_doc)
+    try:
+        await bookings_collection.insert_one(booking_doc)
+    except Exception:
+        await release_nights(booking_id)
+        raise
     
     return {
         "message": "Booking created successfully",
@@ -55,24 +67,57 @@ async def create_booking(booking_data: BookingCreate, current_user: dict = Depen
     }
 
 @router.get("/my-bookings", response_model=dict)
-async def get_user_bookings(current_user: dict = Depends(get_current_user)):
-    bookings = list(bookings_collection.find({"guest_id": current_user["id"]}))
-    
-    # Remove MongoDB _id field and add property details
+async def get_user_bookings(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    booking_status: Optional[BookingStatus] = Query(None, alias="status"),
+    check_in_from: Optional[datetime] = None,
+    check_in_to: Optional[datetime] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    filter_query = {"guest_id": current_user["id"]}
+    if booking_status:
+        filter_query["status"] = booking_status
+    if check_in_from or check_in_to:
+        filter_query["check_in"] = {}
+        if check_in_from:
+            filter_query["check_in"]["$gte"] = check_in_from
+        if check_in_to:
+            filter_query["check_in"]["$lt"] = check_in_to
+    
+    page_query = filter_query
+    if cursor:
+        page_query = {"$and": [filter_query, keyset_filter(decode_cursor(cursor, TRIP_SORT), TRIP_SORT)]}
+    
+    # Fetch one extra booking to learn whether another page exists
+    bookings = await bookings_collection.find(page_query, {"_id": 0}) \
+        .sort(TRIP_SORT).limit(limit + 1).to_list(length=limit + 1)
+    has_more = len(bookings) > limit
+    bookings = bookings[:limit]
+    
+    # Fetch every property on the page in one query instead of one lookup per booking
+    properties = await properties_collection.find(
+        {"id": {"$in": list({booking["property_id"] for booking in bookings})}},
+        PROPERTY_CARD
+    ).to_list(length=None)
+    properties_by_id = {prop["id"]: prop for prop in properties}
+    
+    # Add property details
     for booking in bookings:
-        booking.pop("_id", None)
-        property_doc = properties_collection.find_one({"id": booking["property_id"]})
+        property_doc = properties_by_id.get(booking["property_id"])
         if property_doc:
             booking["property"] = {
                 "title": property_doc["title"],
                 "location": property_doc["location"],
-                "images": property_doc["images"][:1] if property_doc["images"] else []
+                "images": property_doc.get("images") or []
             }
     
-    return {
+    return FastJSONResponse({
         "bookings": bookings,
-        "total": len(bookings)
-    }
+        "total": await bookings_collection.count_documents(filter_query),
+        "limit": limit,
+        "next_cursor": encode_cursor(bookings[-1], TRIP_SORT) if has_more else None
+    })
 
 @router.get("/host/bookings", response_model=dict)
 async def get_host_bookings(current_user: dict = Depends(get_current_user)):
@@ -83,27 +128,36 @@ async def get_host_bookings(current_user: dict = Depends(get_current_user)):
         )
     
     # Get host properties
-    host_properties = list(properties_collection.find({"host_id": current_user["id"]}))
-    property_ids = [prop["id"] for prop in host_properties]
+    host_properties = await properties_collection.find(
+        {"host_id": current_user["id"]},
+        {"_id": 0, "id": 1, "title": 1, "location": 1}
+    ).to_list(length=None)
+    properties_by_id = {prop["id"]: prop for prop in host_properties}
     
     # Get bookings for host properties
-    bookings = list(bookings_collection.find({"property_id": {"$in": property_ids}}))
-    
-    # Remove MongoDB _id field and add property/guest details
+    bookings = await bookings_collection.find(
+        {"property_id": {"$in": list(properties_by_id)}},
+        {"_id": 0}
+    ).to_list(length=None)
+    
+    # Fetch every guest in one query instead of one lookup per booking
+    guest_ids = list({booking["guest_id"] for booking in bookings})
+    guests = await users_collection.find(
+        {"id": {"$in": guest_ids}},
+        {"_id": 0, "id": 1, "first_name": 1, "last_name": 1, "email": 1}
+    ).to_list(length=None)
+    guests_by_id = {guest["id"]: guest for guest in guests}
+    
+    # Add property/guest details
     for booking in bookings:
-        booking.pop("_id", None)
-        
-        # Add property details
-        property_doc = properties_collection.find_one({"id": booking["property_id"]})
+        property_doc = properties_by_id.get(booking["property_id"])
         if property_doc:
             booking["property"] = {
                 "title": property_doc["title"],
                 "location": property_doc["location"]
             }
         
-        # Add guest details
-        from database import users_collection
-        guest = users_collection.find_one({"id": booking["guest_id"]})
+        guest = guests_by_id.get(booking["guest_id"])
         if guest:
             booking["guest"] = {
                 "first_name": guest["first_name"],
@@ -111,14 +165,18 @@ async def get_host_bookings(current_user: dict = Depends(get_current_user)):
                 "email": guest["email"]
             }
     
-    return {
+    return FastJSONResponse({
         "bookings": bookings,
         "total": len(bookings)
-    }
+    })
 
 @router.put("/{booking_id}/status", response_model=dict)
-async def update_booking_status(booking_id: str, status: BookingStatus, current_user: dict = Depends(get_current_user)):
-    booking = bookings_collection.find_one({"id": booking_id})
+async def update_booking_status(
+    booking_id: str,
+    new_status: BookingStatus = Query(..., alias="status"),
+    current_user: dict = Depends(get_current_user)
+):
+    booking = await bookings_collection.find_one({"id": booking_id})
     if not booking:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -126,7 +184,7 @@ async def update_booking_status(booking_id: str, status: BookingStatus, current_
         )
     
     # Check if user is the host of the property or the guest
-    property_doc = properties_collection.find_one({"id": booking["property_id"]})
+    property_doc = await properties_collection.find_one({"id": booking["property_id"]}, PROPERTY_OWNER)
     if not property_doc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -139,13 +197,36 @@ async def update_booking_status(booking_id: str, status: BookingStatus, current_
             detail="You don't have permission to update this booking"
         )
     
-    bookings_collection.update_one(
-        {"id": booking_id},
-        {"$set": {"status": status, "updated_at": datetime.utcnow()}}
+    # Keep the availability calendar in step with the booking's status. The
+    # status only moves from the value read above, so of two concurrent
+    # updates one wins and the other changes neither status nor calendar.
+    was_cancelled = booking["status"] == BookingStatus.CANCELLED
+    reactivating = was_cancelled and new_status in ACTIVE_BOOKING_STATUSES
+    if reactivating:
+        if not await reserve_nights(booking["property_id"], booking_id, booking["check_in"], booking["check_out"]):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Property is no longer available for these dates"
+            )
+    
+    result = await bookings_collection.update_one(
+        {"id": booking_id, "status": booking["status"]},
+        {"$set": {"status": new_status, "updated_at": datetime.utcnow()}}
     )
+    if not result.matched_count:
+        if reactivating:
+            await release_nights(booking_id, booking_nights(booking["check_in"], booking["check_out"]))
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Booking status changed concurrently; reload and try again"
+        )
+    if not was_cancelled and new_status == BookingStatus.CANCELLED:
+        await release_nights(booking_id)
+    
+    await publish_booking_update(booking, property_doc["host_id"], new_status)
     
     return {
         "message": "Booking status updated successfully",
         "booking_id": booking_id,
-        "status": status
+        "status": new_status
     }
\ No newline at end of file
@@ -1,17 +1,27 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 from models import MessageCreate, MessageResponse, ConversationResponse
 from database import messages_collection, conversations_collection, users_collection
 from routes.auth import get_current_user
+from pagination import encode_cursor, decode_cursor, keyset_filter
+from realtime import publish_message, publish_read_receipt
+from projections import USER_PROFILE
+from responses import FastJSONResponse
+from unread import increment_unread, decrement_unread, get_unread_summary, get_unread_total
+from conversations import participant_profile, fill_conversation_summaries
 from datetime import datetime
-from typing import List
+from typing import Optional
 
 router = APIRouter()
 
+# Chronological order with id as tie-breaker for (created_at, id) cursors
+MESSAGE_SORT = [("created_at", 1), ("id", 1)]
+PROFILE_FIELDS = ("first_name", "last_name", "profile_image")
+
 @router.post("/conversations", response_model=dict)
 async def create_conversation(participant_id: str, property_id: str = None, current_user: dict = Depends(get_current_user)):
     # Check if conversation already exists
     participants = sorted([current_user["id"], participant_id])
-    existing_conversation = conversations_collection.find_one({
+    existing_conversation = await conversations_collection.find_one({
         "participants": participants,
         "property_id": property_id
     })
@@ -25,15 +35,23 @@ async def create_conversation(participant_id: str, property_id: str = None, curr
     from auth import generate_uuid
     conversation_id = generate_uuid()
     
+    # Denormalize participant summaries so the inbox never has to join users
+    users = await users_collection.find(
+        {"id": {"$in": participants}},
+        USER_PROFILE
+    ).to_list(length=None)
+    
     conversation_doc = {
         "id": conversation_id,
         "participants": participants,
+        "participant_profiles": {user["id"]: participant_profile(user) for user in users},
         "property_id": property_id,
+        "last_message": None,
         "created_at": datetime.utcnow(),
         "updated_at": datetime.utcnow()
     }
     
-    conversations_collection.insert_one(conversation_doc)
+    await conversations_collection.insert_one(conversation_doc)
     
     return {
         "conversation_id": conversation_id,
@@ -42,13 +60,17 @@ async def create_conversation(participant_id: str, property_id: str = None, curr
 
 @router.get("/conversations", response_model=dict)
 async def get_conversations(current_user: dict = Depends(get_current_user)):
-    conversations = list(conversations_collection.find({
-        "participants": current_user["id"]
-    }))
+    conversations = await conversations_collection.find(
+        {"participants": current_user["id"]},
+        {"_id": 0}
+    ).sort("updated_at", -1).to_list(length=None)
+    
+    await fill_conversation_summaries(conversations)
+    unread = (await get_unread_summary(current_user["id"]))["conversations"]
     
     conversation_list = []
     for conv in conversations:
-        conv.pop("_id", None)
+        profiles = conv.pop("participant_profiles", {})
         
         # Get other participant details
         other_participant_id = None
@@ -57,24 +79,13 @@ async def get_conversations(current_user: dict = Depends(get_current_user)):
                 other_participant_id = participant
                 break
         
-        if other_participant_id:
-            participant = users_collection.find_one({"id": other_participant_id})
-            if participant:
-                conv["other_participant"] = {
-                    "id": participant["id"],
-                    "first_name": participant["first_name"],
-                    "last_name": participant["last_name"],
-                    "profile_image": participant.get("profile_image")
-                }
+        if other_participant_id and other_participant_id in profiles:
+            conv["other_participant"] = profiles[other_participant_id]
         
-        # Get last message
-        last_message = messages_collection.find_one(
-            {"conversation_id": conv["id"]},
-            sort=[("created_at", -1)]
-        )
-        if last_message:
-            last_message.pop("_id", None)
-            conv["last_message"] = last_message
+        if not conv.get("last_message"):
+            conv.pop("last_message", None)
+        
+        conv["unread_count"] = unread.get(conv["id"], 0)
         
         conversation_list.append(conv)
     
@@ -83,10 +94,14 @@ async def get_conversations(current_user: dict = Depends(get_current_user)):
         "total": len(conversation_list)
     }
 
+@router.get("/unread", response_model=dict)
+async def get_unread_counts(current_user: dict = Depends(get_current_user)):
+    return await get_unread_summary(current_user["id"])
+
 @router.post("/", response_model=dict)
 async def send_message(message_data: MessageCreate, current_user: dict = Depends(get_current_user)):
     # Verify conversation exists and user is participant
-    conversation = conversations_collection.find_one({"id": message_data.conversation_id})
+    conversation = await conversations_collection.find_one({"id": message_data.conversation_id})
     if not conversation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -112,13 +127,27 @@ async def send_message(message_data: MessageCreate, current_user: dict = Depends
         "created_at": datetime.utcnow()
     }
     
-    messages_collection.insert_one(message_doc)
+    last_message = dict(message_doc)
+    await messages_collection.insert_one(message_doc)
+    
+    # Keep the inbox summary on the conversation document; a send that lands
+    # after a newer one must not move last_message backwards
+    await conversations_collection.update_one(
+        {
+            "id": message_data.conversation_id,
+            "$or": [
+                {"last_message": None},
+                {"last_message.created_at": {"$lte": message_doc["created_at"]}}
+            ]
+        },
+        {"$set": {"last_message": last_message, "updated_at": datetime.utcnow()}}
+    )
     
-    # Update conversation last updated time
-    conversations_collection.update_one(
-        {"id": message_data.conversation_id},
-        {"$set": {"updated_at": datetime.utcnow()}}
+    await increment_unread(
+        [pid for pid in conversation["participants"] if pid != current_user["id"]],
+        message_data.conversation_id
     )
+    await publish_message(conversation, last_message)
     
     return {
         "message": "Message sent successfully",
@@ -126,9 +155,21 @@ async def send_message(message_data: MessageCreate, current_user: dict = Depends
     }
 
 @router.get("/{conversation_id}", response_model=dict)
-async def get_messages(conversation_id: str, current_user: dict = Depends(get_current_user)):
+async def get_messages(
+    conversation_id: str,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: dict = Depends(get_current_user)
+):
+    if before and after:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either before or after, not both"
+        )
+    
     # Verify conversation exists and user is participant
-    conversation = conversations_collection.find_one({"id": conversation_id})
+    conversation = await conversations_collection.find_one({"id": conversation_id})
     if not conversation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -141,22 +182,35 @@ async def get_messages(conversation_id: str, current_user: dict = Depends(get_cu
             detail="You are not a participant in this conversation"
         )
     
-    messages = list(messages_collection.find({
-        "conversation_id": conversation_id
-    }).sort("created_at", 1))
+    # Newest page by default; `before` pages back through history and
+    # `after` returns only messages newer than the client's last one
+    query = {"conversation_id": conversation_id}
+    if after:
+        query = {"$and": [query, keyset_filter(decode_cursor(after, MESSAGE_SORT), MESSAGE_SORT)]}
+        sort = MESSAGE_SORT
+    else:
+        sort = [(field, -direction) for field, direction in MESSAGE_SORT]
+        if before:
+            query = {"$and": [query, keyset_filter(decode_cursor(before, sort), sort)]}
     
-    # Remove MongoDB _id field
-    for message in messages:
-        message.pop("_id", None)
+    messages = await messages_collection.find(query, {"_id": 0}) \
+        .sort(sort).limit(limit + 1).to_list(length=limit + 1)
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    if not after:
+        messages.reverse()
     
-    return {
+    return FastJSONResponse({
         "messages": messages,
-        "total": len(messages)
-    }
+        "total": len(messages),
+        "has_more": has_more,
+        "prev_cursor": encode_cursor(messages[0], MESSAGE_SORT) if messages else before,
+        "next_cursor": encode_cursor(messages[-1], MESSAGE_SORT) if messages else after
+    })
 
 @router.put("/{message_id}/read", response_model=dict)
 async def mark_message_as_read(message_id: str, current_user: dict = Depends(get_current_user)):
-    message = messages_collection.find_one({"id": message_id})
+    message = await messages_collection.find_one({"id": message_id})
     if not message:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -164,18 +218,84 @@ async def mark_message_as_read(message_id: str, current_user: dict = Depends(get
         )
     
     # Verify user is in the conversation
-    conversation = conversations_collection.find_one({"id": message["conversation_id"]})
+    conversation = await conversations_collection.find_one({"id": message["conversation_id"]})
     if not conversation or current_user["id"] not in conversation["participants"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have permission to mark this message as read"
         )
     
-    messages_collection.update_one(
-        {"id": message_id},
+    result = await messages_collection.update_one(
+        {"id": message_id, "is_read": False},
         {"$set": {"is_read": True}}
     )
+    if result.modified_count:
+        await conversations_collection.update_one(
+            {"id": message["conversation_id"], "last_message.id": message_id},
+            {"$set": {"last_message.is_read": True}}
+        )
+    if message["sender_id"] != current_user["id"]:
+        await decrement_unread(current_user["id"], message["conversation_id"], result.modified_count)
+    
+    await publish_read_receipt(message["conversation_id"], current_user["id"], message_ids=[message_id])
     
     return {
         "message": "Message marked as read"
-    }
\ No newline at end of file
+    }
+
+@router.put("/conversations/{conversation_id}/read", response_model=dict)
+async def mark_conversation_as_read(
+    conversation_id: str,
+    up_to_message_id: Optional[str] = None,
+    up_to: Optional[datetime] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    conversation = await conversations_collection.find_one({"id": conversation_id}, {"_id": 0, "participants": 1})
+    if not conversation or current_user["id"] not in conversation["participants"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to mark this conversation as read"
+        )
+    
+    if up_to_message_id:
+        last_read = await messages_collection.find_one(
+            {"id": up_to_message_id, "conversation_id": conversation_id},
+            {"_id": 0, "created_at": 1}
+        )
+        if not last_read:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Message not found"
+            )
+        up_to = last_read["created_at"]
+    
+    # Everything the other participants sent up to the cutoff, in one write
+    query = {
+        "conversation_id": conversation_id,
+        "is_read": False,
+        "sender_id": {"$ne": current_user["id"]}
+    }
+    if up_to:
+        query["created_at"] = {"$lte": up_to}
+    
+    result = await messages_collection.update_many(query, {"$set": {"is_read": True}})
+    if result.modified_count:
+        # The inbox summary follows when the cutoff reaches the last message
+        summary_query = {
+            "id": conversation_id,
+            "last_message.is_read": False,
+            "last_message.sender_id": {"$ne": current_user["id"]}
+        }
+        if up_to:
+            summary_query["last_message.created_at"] = {"$lte": up_to}
+        await conversations_collection.update_one(summary_query, {"$set": {"last_message.is_read": True}})
+    await decrement_unread(current_user["id"], conversation_id, result.modified_count)
+    
+    if result.modified_count:
+        await publish_read_receipt(conversation_id, current_user["id"], up_to=up_to or datetime.utcnow())
+    
+    return {
+        "message": "Conversation marked as read",
+        "marked_read": result.modified_count,
+        "unread_total": await get_unread_total(current_user["id"])
+    }
@@ -1,12 +1,37 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
 from models import PropertyCreate, PropertyResponse
 from database import properties_collection
 from routes.auth import get_current_user
+from cache import TTLCache
+from response_cache import ResponseCache
+from responses import FastJSONResponse
+from pagination import encode_cursor, decode_cursor, keyset_filter
+from sorts import LISTING_SORTS
+from geo import within_radius, within_bbox, check_lat_lng, check_bbox
+from normalization import city_key
+from projections import PROPERTY_VIEWS, project, pipeline_projection
+from catalog import property_snapshot
+from availability import exclude_booked, booking_nights
 from datetime import datetime
 from typing import List, Optional
+import hashlib
+import json
+import os
+import re
 
 router = APIRouter()
 
+RESPONSE_CACHE_MAX_SIZE = int(os.getenv("PROPERTY_RESPONSE_CACHE_MAX_SIZE", "2048"))
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("PROPERTY_RESPONSE_CACHE_TTL_SECONDS", "60"))
+# Public listing and detail bodies; a shared CacheBackend can replace the
+# in-process store when several workers should see the same entries
+response_cache = ResponseCache(TTLCache(maxsize=RESPONSE_CACHE_MAX_SIZE, ttl=RESPONSE_CACHE_TTL_SECONDS))
+
+def invalidate_property_caches():
+    """Call after every property write so public reads never serve stale listings."""
+    response_cache.invalidate()
+    count_cache.clear()
+
 @router.post("/", response_model=dict)
 async def create_property(property_data: PropertyCreate, current_user: dict = Depends(get_current_user)):
     if current_user["user_type"] != "host":
@@ -38,26 +63,145 @@ async def create_property(property_data: PropertyCreate, current_user: dict = De
         "updated_at": datetime.utcnow()
     }
     
-    properties_collection.insert_one(property_doc)
+    await properties_collection.insert_one(property_doc)
+    property_snapshot.apply(property_doc)
+    invalidate_property_caches()
     
     return {
         "message": "Property created successfully",
         "property_id": property_id
     }
 
+COUNT_CACHE_MAX_SIZE = int(os.getenv("PROPERTY_COUNT_CACHE_MAX_SIZE", "1024"))
+COUNT_CACHE_TTL = int(os.getenv("PROPERTY_COUNT_CACHE_TTL_SECONDS", "30"))
+# One entry per distinct filter, so it is bounded and evicts instead of
+# growing with every new combination of query parameters
+count_cache = TTLCache(maxsize=COUNT_CACHE_MAX_SIZE, ttl=COUNT_CACHE_TTL)
+
+def parse_floats(value: str, count: int, name: str) -> List[float]:
+    try:
+        numbers = [float(part) for part in value.split(",")]
+    except ValueError:
+        numbers = []
+    if len(numbers) != count:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{name} must be {count} comma-separated numbers"
+        )
+    return numbers
+
+def parse_area(value: str, count: int, name: str, check) -> List[float]:
+    """Numbers for a geo filter, checked the way stored coordinates are, so
+    MongoDB never sees a point or box it would reject."""
+    numbers = parse_floats(value, count, name)
+    try:
+        check(*numbers)
+    except ValueError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{name}: {error}"
+        )
+    return numbers
+
+async def count_properties(filter_query: dict, exclude: Optional[List[dict]] = None) -> int:
+    """Total for a filter, served from a short-lived cache so paging does not recount."""
+    if exclude:
+        # Availability moves with every booking, so these totals are never cached
+        result = await properties_collection.aggregate(
+            [{"$match": filter_query}, *exclude, {"$count": "total"}]
+        ).to_list(length=1)
+        return result[0]["total"] if result else 0
+    key = hashlib.sha1(json.dumps(filter_query, sort_keys=True, default=str).encode()).digest()
+    total = count_cache.get(key)
+    if total is None:
+        total = await properties_collection.count_documents(filter_query)
+        count_cache.set(key, total)
+    return total
+
+# Upper bounds of the price facet's buckets; anything above the last is "1000+"
+PRICE_BUCKETS = [0, 50, 100, 200, 500, 1000]
+
+async def property_facets(filter_query: dict, exclude: Optional[List[dict]] = None) -> dict:
+    """Counts for the search sidebar, all computed in one aggregation over the filtered set."""
+    result = await properties_collection.aggregate([
+        {"$match": filter_query},
+        *(exclude or []),
+        {"$facet": {
+            "amenities": [
+                {"$unwind": "$amenities"},
+                {"$group": {"_id": "$amenities", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}}
+            ],
+            "property_type": [
+                {"$group": {"_id": "$property_type", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}}
+            ],
+            "bedrooms": [
+                {"$group": {"_id": "$bedrooms", "count": {"$sum": 1}}},
+                {"$sort": {"_id": 1}}
+            ],
+            "price": [
+                {"$bucket": {
+                    "groupBy": "$price_per_night",
+                    "boundaries": PRICE_BUCKETS,
+                    "default": PRICE_BUCKETS[-1],
+                    "output": {"count": {"$sum": 1}}
+                }}
+            ]
+        }}
+    ]).to_list(length=1)
+    facets = result[0] if result else {}
+    
+    def counts(name: str) -> List[dict]:
+        return [{"value": bucket["_id"], "count": bucket["count"]} for bucket in facets.get(name, [])]
+    
+    upper_bounds = dict(zip(PRICE_BUCKETS, PRICE_BUCKETS[1:]))
+    return {
+        "amenities": counts("amenities"),
+        "property_type": counts("property_type"),
+        "bedrooms": counts("bedrooms"),
+        "price": [
+            {"min": bucket["_id"], "max": upper_bounds.get(bucket["_id"]), "count": bucket["count"]}
+            for bucket in facets.get("price", [])
+        ]
+    }
+
 @router.get("/", response_model=dict)
 async def get_properties(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    # Defaults to on, except for dated searches (see below)
+    include_total: Optional[bool] = None,
+    include_facets: bool = False,
+    sort: str = Query("newest", pattern=f"^({'|'.join(LISTING_SORTS)})$"),
+    view: str = Query("full", pattern="^(summary|full)$"),
     city: Optional[str] = None,
+    city_match: str = Query("prefix", pattern="^(exact|prefix)$"),
     property_type: Optional[str] = None,
     min_price: Optional[float] = None,
-    max_price: Optional[float] = None
+    max_price: Optional[float] = None,
+    near: Optional[str] = Query(None, description="lat,lng"),
+    radius_km: float = Query(10, gt=0, le=500),
+    bbox: Optional[str] = Query(None, description="min_lng,min_lat,max_lng,max_lat"),
+    check_in: Optional[datetime] = None,
+    check_out: Optional[datetime] = None,
+    guests: Optional[int] = Query(None, ge=1),
+    min_bedrooms: Optional[int] = Query(None, ge=1),
+    min_bathrooms: Optional[int] = Query(None, ge=1),
+    amenities: Optional[str] = Query(None, description="Comma-separated amenity names"),
+    amenity_match: str = Query("all", pattern="^(all|any)$")
 ):
     filter_query = {"is_active": True}
     
     if city:
-        filter_query["location.city"] = {"$regex": city, "$options": "i"}
+        key = city_key(city)
+        if city_match == "exact":
+            filter_query["location.city_key"] = key
+        else:
+            # Anchored, case-sensitive prefix regexes become index range scans
+            filter_query["location.city_key"] = {"$regex": f"^{re.escape(key)}"}
     if property_type:
         filter_query["property_type"] = property_type
     if min_price is not None:
@@ -67,24 +211,137 @@ async def get_properties(
             filter_query["price_per_night"]["$lte"] = max_price
         else:
             filter_query["price_per_night"] = {"$lte": max_price}
+    if near and bbox:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either near or bbox, not both"
+        )
+    if near:
+        lat, lng = parse_area(near, 2, "near", check_lat_lng)
+        filter_query["location.geo"] = within_radius(lat, lng, radius_km)
+    elif bbox:
+        filter_query["location.geo"] = within_bbox(*parse_area(bbox, 4, "bbox", check_bbox))
+    if guests is not None:
+        filter_query["max_guests"] = {"$gte": guests}
+    if min_bedrooms is not None:
+        filter_query["bedrooms"] = {"$gte": min_bedrooms}
+    if min_bathrooms is not None:
+        filter_query["bathrooms"] = {"$gte": min_bathrooms}
+    if amenities:
+        wanted = sorted({name.strip() for name in amenities.split(",") if name.strip()})
+        if wanted:
+            filter_query["amenities"] = {"$all" if amenity_match == "all" else "$in": wanted}
     
-    properties = list(properties_collection.find(filter_query).skip(skip).limit(limit))
-    total = properties_collection.count_documents(filter_query)
+    dated = bool(check_in or check_out)
+    # A dated total probes the calendar once for every property the filter
+    # matches, uncached, so those searches only count when asked to
+    if include_total is None:
+        include_total = not dated
+    page = {
+        "sort": sort, "view": view, "skip": skip, "limit": limit, "cursor": cursor,
+        "include_total": include_total, "include_facets": include_facets
+    }
+    if dated:
+        if not (check_in and check_out) or not booking_nights(check_in, check_out):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="check_in and check_out must both be given, at least one night apart"
+            )
+        # Availability changes with every booking, so dated searches bypass the response cache
+        return FastJSONResponse(
+            await list_properties(filter_query, **page, exclude=exclude_booked(check_in, check_out))
+        )
     
-    # Remove MongoDB _id field
-    for prop in properties:
-        prop.pop("_id", None)
+    # Keyed by the normalized filter, so "Cairo", "cairo" and "القاهرة" share one entry
+    cache_key = ("list", property_snapshot.version, json.dumps([filter_query, page], sort_keys=True, default=str))
+    return await response_cache.respond(request, cache_key, lambda: list_properties(filter_query, **page))
+
+async def list_properties(filter_query: dict, sort: str, view: str, skip: int, limit: int, cursor: Optional[str],
+                          include_total: bool, include_facets: bool, exclude: Optional[List[dict]] = None) -> dict:
+    listing_sort = LISTING_SORTS[sort]
+    # A cursor replaces skip: the page starts right after the last document seen
+    after = decode_cursor(cursor, listing_sort) if cursor else None
+    if cursor:
+        skip = 0
     
-    return {
+    # Fetch one extra document to learn whether another page exists
+    page_query = {"$and": [filter_query, keyset_filter(after, listing_sort)]} if after else filter_query
+    # The snapshot holds no bookings, so exclusion stages always go to MongoDB
+    snapshot_page = None if exclude else \
+        property_snapshot.search(filter_query, listing_sort, after, skip, limit + 1, include_total)
+    if snapshot_page:
+        properties, total = snapshot_page
+        properties = [project(property_doc, PROPERTY_VIEWS[view]) for property_doc in properties]
+    elif exclude:
+        # Sorted before the exclusion, so the index order streams through it and
+        # lookups stop once the page is full
+        properties = await properties_collection.aggregate([
+            {"$match": page_query},
+            {"$sort": dict(listing_sort)},
+            *exclude,
+            {"$skip": skip},
+            {"$limit": limit + 1},
+            {"$project": pipeline_projection(PROPERTY_VIEWS[view])}
+        ]).to_list(length=limit + 1)
+        total = await count_properties(filter_query, exclude) if include_total else None
+    else:
+        properties = await properties_collection.find(page_query, PROPERTY_VIEWS[view]) \
+            .sort(listing_sort).skip(skip).limit(limit + 1).to_list(length=limit + 1)
+        total = await count_properties(filter_query) if include_total else None
+    has_more = len(properties) > limit
+    properties = properties[:limit]
+    
+    response = {
         "properties": properties,
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": encode_cursor(properties[-1], listing_sort) if has_more else None
+    }
+    if include_facets:
+        response["facets"] = await property_facets(filter_query, exclude)
+    return response
+
+MAX_BATCH_IDS = 100
+
+# Declared before /{property_id}, which would otherwise capture "batch" as an id
+@router.get("/batch", response_model=dict)
+async def get_properties_batch(
+    request: Request,
+    ids: str = Query(..., description="Comma-separated property ids"),
+    view: str = Query("full", pattern="^(summary|full)$")
+):
+    property_ids = list(dict.fromkeys(part.strip() for part in ids.split(",") if part.strip()))
+    if not property_ids or len(property_ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"ids must list between 1 and {MAX_BATCH_IDS} property ids"
+        )
+    
+    return await response_cache.respond(
+        request, ("batch", view, tuple(property_ids)),
+        lambda: find_properties(property_ids, view)
+    )
+
+async def find_properties(property_ids: List[str], view: str) -> dict:
+    """Many properties in one $in query, in the order they were asked for."""
+    found = await properties_collection.find(
+        {"id": {"$in": property_ids}},
+        PROPERTY_VIEWS[view]
+    ).to_list(length=len(property_ids))
+    by_id = {property_doc["id"]: property_doc for property_doc in found}
+    
+    return {
+        "properties": [by_id[property_id] for property_id in property_ids if property_id in by_id],
+        "missing": [property_id for property_id in property_ids if property_id not in by_id]
     }
 
 @router.get("/{property_id}", response_model=dict)
-async def get_property(property_id: str):
-    property_doc = properties_collection.find_one({"id": property_id})
+async def get_property(property_id: str, request: Request):
+    return await response_cache.respond(request, ("detail", property_id), lambda: find_property(property_id))
+
+async def find_property(property_id: str) -> dict:
+    property_doc = await properties_collection.find_one({"id": property_id})
     if not property_doc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -102,7 +359,7 @@ async def get_host_properties(current_user: dict = Depends(get_current_user)):
             detail="Only hosts can access this endpoint"
         )
     
-    properties = list(properties_collection.find({"host_id": current_user["id"]}))
+    properties = await properties_collection.find({"host_id": current_user["id"]}).to_list(length=None)
     
     # Remove MongoDB _id field
     for prop in properties:
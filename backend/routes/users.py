@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from models import UserUpdate, UserResponse
-from database import users_collection
-from routes.auth import get_current_user
+from database import users_collection, conversations_collection
+from routes.auth import get_current_user, user_cache
+from routes.messages import PROFILE_FIELDS
+from projections import USER_SESSION, USER_PUBLIC
 from datetime import datetime
 
 router = APIRouter()
@@ -26,12 +28,24 @@ async def update_user_profile(user_update: UserUpdate, current_user: dict = Depe
     update_data = {k: v for k, v in user_update.dict().items() if v is not None}
     update_data["updated_at"] = datetime.utcnow()
     
-    users_collection.update_one(
+    await users_collection.update_one(
         {"id": current_user["id"]},
         {"$set": update_data}
     )
     
-    updated_user = users_collection.find_one({"id": current_user["id"]})
+    user_cache.invalidate(current_user["id"])
+    updated_user = await users_collection.find_one({"id": current_user["id"]}, USER_SESSION)
+    
+    # Refresh the participant summaries denormalized onto conversations
+    profile_update = {
+        f"participant_profiles.{current_user['id']}.{field}": update_data[field]
+        for field in PROFILE_FIELDS if field in update_data
+    }
+    if profile_update:
+        await conversations_collection.update_many(
+            {"participants": current_user["id"], "participant_profiles": {"$exists": True}},
+            {"$set": profile_update}
+        )
     
     return {
         "message": "Profile updated successfully",
@@ -48,7 +62,7 @@ async def update_user_profile(user_update: UserUpdate, current_user: dict = Depe
 
 @router.get("/{user_id}", response_model=dict)
 async def get_user_by_id(user_id: str):
-    user = users_collection.find_one({"id": user_id})
+    user = await users_collection.find_one({"id": user_id}, USER_PUBLIC)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
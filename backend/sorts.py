@@ -0,0 +1,9 @@
+# Stable listing orders for GET /api/properties; the trailing id breaks ties so
+# keyset cursors never skip or repeat. indexes.py checks every one of them
+# against its compound index, so a sort added here is verified automatically.
+LISTING_SORTS = {
+    "newest": [("created_at", -1), ("id", -1)],
+    "price_asc": [("price_per_night", 1), ("id", 1)],
+    "price_desc": [("price_per_night", -1), ("id", -1)],
+    "rating": [("rating", -1), ("id", -1)],
+}
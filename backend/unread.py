@@ -0,0 +1,55 @@
+from database import unread_counters_collection
+from typing import List
+
+# One small document per user holding their unread message total and the
+# per-conversation breakdown, so badge counts and the inbox summary are a
+# single keyed read instead of a count over messages:
+#   {"user_id": ..., "total": 3, "conversations": {"<conversation_id>": 3}}
+
+async def increment_unread(user_ids: List[str], conversation_id: str):
+    for user_id in user_ids:
+        await unread_counters_collection.update_one(
+            {"user_id": user_id},
+            {"$inc": {"total": 1, f"conversations.{conversation_id}": 1}},
+            upsert=True
+        )
+
+async def decrement_unread(user_id: str, conversation_id: str, count: int):
+    if count <= 0:
+        return
+    # Pipeline update: take off at most what the conversation holds and the
+    # same amount from the total, so the total always equals the sum of the
+    # conversations. Conversations that reach zero drop out so the document stays small.
+    await unread_counters_collection.update_one(
+        {"user_id": user_id},
+        [
+            {"$set": {"removed": {"$min": [count, {"$ifNull": [f"$conversations.{conversation_id}", 0]}]}}},
+            {"$set": {
+                "total": {"$max": [0, {"$subtract": [{"$ifNull": ["$total", 0]}, "$removed"]}]},
+                "conversations": {"$arrayToObject": {"$filter": {
+                    "input": {"$objectToArray": {"$mergeObjects": [
+                        {"$ifNull": ["$conversations", {}]},
+                        {"$arrayToObject": [[{
+                            "k": conversation_id,
+                            "v": {"$subtract": [{"$ifNull": [f"$conversations.{conversation_id}", 0]}, "$removed"]}
+                        }]]}
+                    ]}},
+                    "cond": {"$gt": ["$$this.v", 0]}
+                }}}
+            }},
+            {"$unset": "removed"}
+        ]
+    )
+
+async def get_unread_summary(user_id: str) -> dict:
+    counter = await unread_counters_collection.find_one(
+        {"user_id": user_id},
+        {"_id": 0, "total": 1, "conversations": 1}
+    )
+    return {
+        "total": counter.get("total", 0) if counter else 0,
+        "conversations": counter.get("conversations", {}) if counter else {}
+    }
+
+async def get_unread_total(user_id: str) -> int:
+    return (await get_unread_summary(user_id))["total"]
@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+EgyptNest Backend Benchmark Suite
+Load and latency measurements against a running backend
+"""
+
+import asyncio
+import json
+import os
+import sys
+import requests
+import time
+import statistics
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Callable
+from pymongo import MongoClient
+from fastapi.encoders import jsonable_encoder
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from pagination import encode_cursor
+from normalization import city_key
+from projections import PROPERTY_VIEWS
+from responses import FastJSONResponse
+from catalog import SnapshotTable
+
+# Configuration
+BASE_URL = "http://localhost:8001/api"
+MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017/egyptnest")
+HEADERS = {"Content-Type": "application/json"}
+CONCURRENCY_LEVELS = [1, 8, 32, 64]
+REQUESTS_PER_LEVEL = 400
+
+class EgyptNestBenchmark:
+    def __init__(self):
+        self.base_url = BASE_URL
+        self.headers = HEADERS.copy()
+        self.session = requests.Session()
+        self.db = MongoClient(MONGO_URL).egyptnest
+        self.results = {}
+
+    def make_request(self, method: str, endpoint: str, data: Dict = None, auth_token: str = None) -> float:
+        """Make HTTP request and return its latency in milliseconds"""
+        url = f"{self.base_url}{endpoint}"
+        headers = self.headers.copy()
+
+        if auth_token:
+            headers["Authorization"] = f"Bearer {auth_token}"
+
+        started = time.perf_counter()
+        response = self.session.request(method, url, headers=headers, json=data, timeout=30)
+        elapsed = (time.perf_counter() - started) * 1000
+        response.raise_for_status()
+        return elapsed
+
+    def register_user(self, user_type: str) -> Dict:
+        """Register a throwaway user and return the auth response"""
+        data = {
+            "email": f"bench-{uuid.uuid4().hex[:12]}@example.com",
+            "password": "BenchPass123!",
+            "first_name": "Bench",
+            "last_name": user_type.title(),
+            "user_type": user_type
+        }
+        response = self.session.post(f"{self.base_url}/auth/register", json=data, timeout=30)
+        response.raise_for_status()
+        return response.json()
+
+    def db_operations(self) -> int:
+        """Server-wide count of query/getmore/command operations issued to MongoDB"""
+        counters = self.db.command("serverStatus")["opcounters"]
+        return counters["query"] + counters["getmore"] + counters["command"]
+
+    def measure_request(self, endpoint: str, auth_token: str = None, repeat: int = 5) -> Dict:
+        """Median latency plus the DB operations one request costs"""
+        self.make_request("GET", endpoint, auth_token=auth_token)
+        before = self.db_operations()
+        self.make_request("GET", endpoint, auth_token=auth_token)
+        # serverStatus itself counts as one command
+        operations = self.db_operations() - before - 1
+        latencies = [self.make_request("GET", endpoint, auth_token=auth_token) for _ in range(repeat)]
+        return {"db_operations": operations, "p50_ms": statistics.median(latencies)}
+
+    def run_concurrent(self, name: str, request_fn: Callable[[], float],
+                       concurrency: int, total: int) -> Dict:
+        """Fire `total` requests with `concurrency` in flight and record throughput"""
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies: List[float] = list(pool.map(lambda _: request_fn(), range(total)))
+        wall = time.perf_counter() - started
+
+        latencies.sort()
+        result = {
+            "concurrency": concurrency,
+            "requests": total,
+            "throughput_rps": total / wall,
+            "p50_ms": statistics.median(latencies),
+            "p99_ms": latencies[int(len(latencies) * 0.99) - 1],
+        }
+        self.results.setdefault(name, []).append(result)
+        print(f"  c={concurrency:<4} {result['throughput_rps']:8.1f} req/s  "
+              f"p50={result['p50_ms']:7.2f}ms  p99={result['p99_ms']:7.2f}ms")
+        return result
+
+    def bench_concurrency_scaling(self):
+        """Throughput of a DB-backed endpoint should grow with in-flight requests"""
+        print("\n⚡ Benchmarking concurrency scaling on GET /properties/...")
+        request_fn = lambda: self.make_request("GET", "/properties/?limit=20")
+        for concurrency in CONCURRENCY_LEVELS:
+            self.run_concurrent("concurrency_scaling", request_fn, concurrency, REQUESTS_PER_LEVEL)
+
+        runs = self.results["concurrency_scaling"]
+        speedup = runs[-1]["throughput_rps"] / runs[0]["throughput_rps"]
+        print(f"  speedup c={runs[-1]['concurrency']} vs c=1: {speedup:.2f}x")
+
+    def bench_host_bookings(self):
+        """DB operations and latency of GET /bookings/host/bookings as bookings grow"""
+        print("\n📅 Benchmarking host bookings enrichment...")
+        for count in [10, 1000, 10000]:
+            host = self.register_user("host")
+            host_id = host["user"]["id"]
+            tag = uuid.uuid4().hex
+            property_id = f"bench-{tag}"
+            guest_ids = [f"bench-{tag}-guest-{i}" for i in range(min(count, 500))]
+            now = datetime.utcnow()
+
+            self.db.properties.insert_one({
+                "id": property_id, "host_id": host_id, "title": "Benchmark Flat",
+                "location": {"city": "Cairo"}, "is_active": True, "bench": tag
+            })
+            self.db.users.insert_many([
+                {"id": guest_id, "email": f"{guest_id}@example.com", "first_name": "Guest",
+                 "last_name": str(i), "user_type": "guest", "bench": tag}
+                for i, guest_id in enumerate(guest_ids)
+            ])
+            self.db.bookings.insert_many([
+                {"id": f"{property_id}-{i}", "property_id": property_id,
+                 "guest_id": guest_ids[i % len(guest_ids)],
+                 "check_in": now + timedelta(days=2 * i), "check_out": now + timedelta(days=2 * i + 1),
+                 "guests": 1, "total_price": 100.0, "status": "confirmed",
+                 "created_at": now, "updated_at": now, "bench": tag}
+                for i in range(count)
+            ])
+
+            try:
+                result = self.measure_request("/bookings/host/bookings", auth_token=host["access_token"])
+                result["bookings"] = count
+                self.results.setdefault("host_bookings", []).append(result)
+                print(f"  bookings={count:<6} db_ops={result['db_operations']:<4} p50={result['p50_ms']:8.2f}ms")
+            finally:
+                for collection in (self.db.properties, self.db.users, self.db.bookings):
+                    collection.delete_many({"bench": tag})
+                self.db.users.delete_one({"id": host_id})
+
+    def bench_guest_bookings(self):
+        """DB operations and latency of a page of GET /bookings/my-bookings as trips grow"""
+        print("\n🧳 Benchmarking guest trips enrichment...")
+        for count in [10, 1000, 10000]:
+            guest = self.register_user("guest")
+            guest_id = guest["user"]["id"]
+            tag = uuid.uuid4().hex
+            now = datetime.utcnow()
+            self.seed_properties(min(count, 1000), tag)
+            self.db.bookings.insert_many([
+                {"id": f"bench-{tag}-booking-{i}", "property_id": f"bench-{tag}-{i % 1000}",
+                 "guest_id": guest_id,
+                 "check_in": now + timedelta(days=2 * i), "check_out": now + timedelta(days=2 * i + 1),
+                 "guests": 1, "total_price": 100.0, "status": "confirmed",
+                 "created_at": now, "updated_at": now, "bench": tag}
+                for i in range(count)
+            ])
+
+            try:
+                result = self.measure_request("/bookings/my-bookings?limit=50", auth_token=guest["access_token"])
+                result["bookings"] = count
+                self.results.setdefault("guest_bookings", []).append(result)
+                print(f"  bookings={count:<6} db_ops={result['db_operations']:<4} p50={result['p50_ms']:8.2f}ms")
+            finally:
+                for collection in (self.db.properties, self.db.bookings):
+                    collection.delete_many({"bench": tag})
+                self.db.users.delete_one({"id": guest_id})
+
+    def synthetic_property(self, i: int, tag: str, now: datetime) -> Dict:
+        """One realistic property document, varied by index"""
+        cities = ["Cairo", "Alexandria", "Giza", "Luxor", "Aswan", "Hurghada", "Sharm El Sheikh", "Dahab"]
+        city_centers = [(30.0444, 31.2357), (31.2001, 29.9187), (30.0131, 31.2089), (25.6872, 32.6396),
+                        (24.0889, 32.8998), (27.2579, 33.8116), (27.9158, 34.3300), (28.5091, 34.5136)]
+        types = ["apartment", "house", "villa", "room"]
+        amenities = ["wifi", "pool", "air_conditioning", "kitchen", "parking", "sea_view", "gym"]
+        return {
+            "id": f"bench-{tag}-{i}", "host_id": f"bench-{tag}-host-{i % 200}",
+            "title": f"{types[i % 4].title()} #{i} in {cities[i % 8]}",
+            "description": "Synthetic benchmark listing " * 8,
+            "property_type": types[i % 4], "price_per_night": float(20 + (i * 37) % 980),
+            "location": {
+                "address": f"{i} Benchmark St", "city": cities[i % 8], "country": "Egypt",
+                "city_key": city_key(cities[i % 8]),
+                "geo": {"type": "Point", "coordinates": [
+                    city_centers[i % 8][1] + (i % 97 - 48) / 1000,
+                    city_centers[i % 8][0] + (i % 89 - 44) / 1000
+                ]}
+            },
+            "amenities": amenities[:1 + i % len(amenities)],
+            "images": [f"https://example.com/{tag}/{i}/{n}.jpg" for n in range(5)],
+            "max_guests": 1 + i % 8, "bedrooms": 1 + i % 5, "bathrooms": 1 + i % 3,
+            "is_active": True, "rating": round((i % 50) / 10, 1), "review_count": i % 300,
+            "created_at": now - timedelta(seconds=i), "updated_at": now, "bench": tag
+        }
+
+    def seed_properties(self, count: int, tag: str, batch_size: int = 5000):
+        """Insert `count` synthetic active properties marked with `tag`"""
+        now = datetime.utcnow()
+        for offset in range(0, count, batch_size):
+            self.db.properties.insert_many([
+                self.synthetic_property(i, tag, now)
+                for i in range(offset, min(offset + batch_size, count))
+            ])
+
+    def bench_deep_pagination(self):
+        """Latency of GET /properties/ at increasing page depth, skip vs cursor"""
+        print("\n📄 Benchmarking deep pagination...")
+        limit = 10
+        pages = [1, 10, 100, 1000, 10000]
+        tag = uuid.uuid4().hex
+        self.seed_properties(pages[-1] * limit, tag)
+        listing_sort = [("created_at", -1), ("id", -1)]
+
+        try:
+            for page in pages:
+                offset = (page - 1) * limit
+                skip_result = self.measure_request(f"/properties/?limit={limit}&skip={offset}")
+
+                cursor_endpoint = f"/properties/?limit={limit}&include_total=false"
+                if offset:
+                    boundary = self.db.properties.find({"is_active": True}) \
+                        .sort(listing_sort).skip(offset - 1).limit(1).next()
+                    cursor_endpoint += f"&cursor={encode_cursor(boundary, listing_sort)}"
+                cursor_result = self.measure_request(cursor_endpoint)
+
+                self.results.setdefault("deep_pagination", []).append(
+                    {"page": page, "skip": skip_result, "cursor": cursor_result})
+                print(f"  page={page:<6} skip p50={skip_result['p50_ms']:8.2f}ms  "
+                      f"cursor p50={cursor_result['p50_ms']:8.2f}ms")
+        finally:
+            self.db.properties.delete_many({"bench": tag})
+
+    def bench_city_search(self, catalog_size: int = 1000000):
+        """City search latency on a large synthetic catalog"""
+        print(f"\n🏙️  Benchmarking city search on {catalog_size:,} properties...")
+        tag = uuid.uuid4().hex
+        self.seed_properties(catalog_size, tag)
+
+        try:
+            for query in ["city=Cairo&city_match=exact", "city=القاهرة&city_match=exact",
+                          "city=Alex", "city=Sharm&property_type=villa"]:
+                result = self.measure_request(f"/properties/?limit=20&include_total=false&{query}")
+                self.results.setdefault("city_search", []).append({"query": query, **result})
+                print(f"  {query:<36} p50={result['p50_ms']:8.2f}ms")
+        finally:
+            self.db.properties.delete_many({"bench": tag})
+
+    def bench_listing_views(self, page_size: int = 100, repeat: int = 50):
+        """Bytes on the wire and serialization time for summary vs full listings"""
+        print(f"\n🗜️  Benchmarking listing views ({page_size} properties per page)...")
+        tag = uuid.uuid4().hex
+        self.seed_properties(page_size, tag)
+
+        try:
+            for view, projection in PROPERTY_VIEWS.items():
+                response = self.session.get(f"{self.base_url}/properties/?view={view}&limit={page_size}",
+                                            timeout=30)
+                response.raise_for_status()
+                documents = list(self.db.properties.find({"bench": tag}, projection))
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    json.dumps(jsonable_encoder(documents))
+                serialize_ms = (time.perf_counter() - started) * 1000 / repeat
+                result = {"view": view, "response_bytes": len(response.content), "serialize_ms": serialize_ms}
+                self.results.setdefault("listing_views", []).append(result)
+                print(f"  {view:<8} {result['response_bytes']:>9,} bytes  serialize={serialize_ms:7.2f}ms")
+        finally:
+            self.db.properties.delete_many({"bench": tag})
+
+    def bench_serialization(self, sizes: List[int] = [10, 100, 1000], repeat: int = 50):
+        """Encoding cost of a listing page: FastAPI's default path vs the orjson response class"""
+        print("\n🧾 Benchmarking response serialization...")
+        now = datetime.utcnow()
+        for size in sizes:
+            payload = {"properties": [self.synthetic_property(i, "serialize", now) for i in range(size)],
+                       "total": size, "skip": 0, "limit": size, "next_cursor": None}
+            timings = {}
+            for name, encode in [("jsonable_encoder", lambda: json.dumps(jsonable_encoder(payload)).encode()),
+                                 ("orjson", lambda: FastJSONResponse(payload).body)]:
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    encode()
+                timings[name] = (time.perf_counter() - started) * 1000 / repeat
+            self.results.setdefault("serialization", []).append({"items": size, **timings})
+            print(f"  items={size:<5} jsonable_encoder={timings['jsonable_encoder']:8.3f}ms  "
+                  f"orjson={timings['orjson']:7.3f}ms  ({timings['jsonable_encoder'] / timings['orjson']:.1f}x)")
+
+    def bench_snapshot_search(self, catalog_size: int = 200000, duration_s: float = 5.0):
+        """Listing queries per second on one core, served from the in-process property snapshot"""
+        print(f"\n🧮 Benchmarking snapshot search on {catalog_size:,} properties...")
+        now = datetime.utcnow()
+        documents = [self.synthetic_property(i, "snapshot", now) for i in range(catalog_size)]
+        started = time.perf_counter()
+        snapshot = SnapshotTable(documents)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        newest = [("created_at", -1), ("id", -1)]
+        queries = [
+            {"is_active": True},
+            {"is_active": True, "location.city_key": "cairo"},
+            {"is_active": True, "location.city_key": {"$regex": "^alex"}, "max_guests": {"$gte": 4}},
+            {"is_active": True, "property_type": "villa", "price_per_night": {"$gte": 100, "$lte": 500}},
+            {"is_active": True, "location.geo": {"$geoWithin": {"$centerSphere": [[31.2357, 30.0444], 5 / 6378.1]}}},
+        ]
+        served = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < duration_s:
+            snapshot.search(queries[served % len(queries)], newest, None, 0, 21, True)
+            served += 1
+        qps = served / (time.perf_counter() - started)
+        self.results["snapshot_search"] = {"catalog_size": catalog_size, "build_ms": build_ms, "qps_per_core": qps}
+        print(f"  build={build_ms:8.1f}ms  {qps:8.1f} queries/s/core  ({1000 / qps:.3f}ms per query)")
+
+    def bench_availability_search(self, catalog_size: int = 100000, booking_count: int = 1000000):
+        """Date-range availability search over a large catalog and calendar"""
+        print(f"\n🗓️  Benchmarking availability search ({catalog_size:,} properties, {booking_count:,} bookings)...")
+        tag = uuid.uuid4().hex
+        self.seed_properties(catalog_size, tag)
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        for offset in range(0, booking_count, 10000):
+            self.db.property_nights.insert_many([
+                {"property_id": f"bench-{tag}-{i % catalog_size}",
+                 "night": today + timedelta(days=(i // catalog_size) * 37 % 365),
+                 "booking_id": f"bench-{tag}-booking-{i}", "bench": tag}
+                for i in range(offset, min(offset + 10000, booking_count))
+            ])
+
+        try:
+            # The page alone, and the opt-in total that probes every matching property
+            for nights in [1, 3, 7]:
+                for include_total in [False, True]:
+                    check_in = today + timedelta(days=37)
+                    check_out = check_in + timedelta(days=nights)
+                    query = (f"check_in={check_in.date().isoformat()}&check_out={check_out.date().isoformat()}"
+                             f"&guests=2&limit=20&include_total={str(include_total).lower()}")
+                    result = self.measure_request(f"/properties/?{query}")
+                    self.results.setdefault("availability_search", []).append(
+                        {"nights": nights, "include_total": include_total, **result}
+                    )
+                    print(f"  nights={nights}  total={str(include_total):<5}  db_ops={result['db_operations']:<3} "
+                          f"p50={result['p50_ms']:8.2f}ms")
+        finally:
+            self.db.properties.delete_many({"bench": tag})
+            self.db.property_nights.delete_many({"bench": tag})
+
+    def bench_socket_fanout(self, connections: int = 2000, messages: int = 5, name: str = "socket_fanout"):
+        """Time for one sent message to reach every socket joined to its conversation"""
+        print(f"\n📡 Benchmarking Socket.IO delivery to {connections:,} connections ({name})...")
+        import socketio
+
+        guest = self.register_user("guest")
+        host = self.register_user("host")
+        response = self.session.post(
+            f"{self.base_url}/messages/conversations",
+            params={"participant_id": host["user"]["id"]},
+            headers={"Authorization": f"Bearer {guest['access_token']}"},
+            timeout=30
+        )
+        response.raise_for_status()
+        conversation_id = response.json()["conversation_id"]
+        server_url = self.base_url.rsplit("/api", 1)[0]
+
+        async def run():
+            received = 0
+            all_received = asyncio.Event()
+
+            async def on_new_message(data):
+                nonlocal received
+                received += 1
+                if received == connections:
+                    all_received.set()
+
+            async def open_client():
+                client = socketio.AsyncClient()
+                client.on("new_message", on_new_message)
+                await client.connect(server_url, auth={"token": host["access_token"]}, transports=["websocket"])
+                await client.call("join_conversation", {"conversation_id": conversation_id})
+                return client
+
+            clients = []
+            for offset in range(0, connections, 100):
+                clients += await asyncio.gather(*[open_client() for _ in range(offset, min(offset + 100, connections))])
+
+            latencies = []
+            for n in range(messages):
+                received = 0
+                all_received.clear()
+                started = time.perf_counter()
+                await asyncio.to_thread(
+                    self.make_request, "POST", "/messages/",
+                    {"conversation_id": conversation_id, "content": f"fan-out {n}", "sender_id": guest["user"]["id"]},
+                    guest["access_token"]
+                )
+                await asyncio.wait_for(all_received.wait(), timeout=60)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+            await asyncio.gather(*[client.disconnect() for client in clients])
+            return latencies
+
+        try:
+            latencies = asyncio.run(run())
+        finally:
+            self.db.messages.delete_many({"conversation_id": conversation_id})
+            self.db.conversations.delete_one({"id": conversation_id})
+            self.db.users.delete_many({"id": {"$in": [guest["user"]["id"], host["user"]["id"]]}})
+
+        result = {"connections": connections, "p50_ms": statistics.median(latencies), "max_ms": max(latencies)}
+        self.results[name] = result
+        print(f"  send -> delivered to all {connections:,}: p50={result['p50_ms']:.2f}ms  max={result['max_ms']:.2f}ms")
+
+    def bench_cross_worker_delivery(self):
+        """End-to-end delivery latency with sockets spread over worker processes.
+
+        Run the server with EVENT_BROKER=mongo and `uvicorn main:app --workers 4`
+        (or more); each socket lands on an arbitrary worker, so most deliveries
+        cross processes through the broker.
+        """
+        self.bench_socket_fanout(connections=256, messages=20, name="cross_worker_delivery")
+
+    def bench_login_storm(self):
+        """Latency of GET /properties/ while many clients hammer POST /auth/login"""
+        print("\n🔐 Benchmarking unrelated endpoint latency under a login storm...")
+        user = self.register_user("guest")
+        credentials = {"email": user["user"]["email"], "password": "BenchPass123!"}
+        statuses = {}
+        stop = threading.Event()
+
+        def login_loop():
+            session = requests.Session()
+            while not stop.is_set():
+                response = session.post(f"{self.base_url}/auth/login", json=credentials, timeout=30)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        baseline = [self.make_request("GET", "/properties/?limit=20") for _ in range(50)]
+
+        workers = [threading.Thread(target=login_loop, daemon=True) for _ in range(32)]
+        for worker in workers:
+            worker.start()
+        time.sleep(1)
+        try:
+            under_load = [self.make_request("GET", "/properties/?limit=20") for _ in range(50)]
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+            self.db.users.delete_one({"id": user["user"]["id"]})
+
+        result = {
+            "baseline_p50_ms": statistics.median(baseline),
+            "storm_p50_ms": statistics.median(under_load),
+            "login_statuses": statuses,
+        }
+        self.results["login_storm"] = result
+        print(f"  /properties p50 idle={result['baseline_p50_ms']:.2f}ms  "
+              f"during storm={result['storm_p50_ms']:.2f}ms  login statuses={statuses}")
+
+    def bench_token_verification(self, iterations: int = 100000):
+        """In-process cost of jwt.decode vs a verified-token cache hit"""
+        print("\n🎟️  Benchmarking token verification...")
+        import jwt
+        from auth import ALGORITHM, SECRET_KEY, create_access_token, token_cache, verify_token
+
+        token = create_access_token(data={"sub": "bench-user"})
+
+        # The cache must never vouch for tampered or expired tokens
+        verify_token(token)
+        header, payload, signature = token.split(".")
+        tampered = f"{header}.{payload}.{'A' if signature[0] != 'A' else 'B'}{signature[1:]}"
+        expired = create_access_token(data={"sub": "bench-user"}, expires_delta=timedelta(seconds=1))
+        verify_token(expired)
+        time.sleep(1.1)
+        for label, bad_token in (("tampered", tampered), ("expired", expired)):
+            try:
+                verify_token(bad_token)
+                raise AssertionError(f"{label} token was accepted")
+            except AssertionError:
+                raise
+            except Exception:
+                pass
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        decode_us = (time.perf_counter() - started) / iterations * 1e6
+
+        token_cache.clear()
+        verify_token(token)
+        started = time.perf_counter()
+        for _ in range(iterations):
+            verify_token(token)
+        cached_us = (time.perf_counter() - started) / iterations * 1e6
+
+        self.results["token_verification"] = {"decode_us": decode_us, "cached_us": cached_us}
+        print(f"  jwt.decode={decode_us:.2f}us  cache hit={cached_us:.2f}us  "
+              f"({decode_us / cached_us:.1f}x)")
+
+    def run_all_benchmarks(self):
+        """Run all benchmark suites"""
+        print("🚀 Starting EgyptNest Backend Benchmarks...")
+        print("=" * 50)
+
+        self.bench_concurrency_scaling()
+        self.bench_host_bookings()
+        self.bench_guest_bookings()
+        self.bench_deep_pagination()
+        self.bench_city_search()
+        self.bench_listing_views()
+        self.bench_serialization()
+        self.bench_snapshot_search()
+        self.bench_availability_search()
+        self.bench_login_storm()
+        self.bench_token_verification()
+        self.bench_socket_fanout()
+        self.bench_cross_worker_delivery()
+
+        print("\n" + "=" * 50)
+
+if __name__ == "__main__":
+    benchmark = EgyptNestBenchmark()
+    benchmark.run_all_benchmarks()
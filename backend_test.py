@@ -7,6 +7,7 @@ Comprehensive testing for all backend endpoints
 import requests
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, Any
 
@@ -170,6 +171,17 @@ class EgyptNestAPITester:
                 self.log_result("authentication", "Get Current User", False,
                               f"Status: {response['status_code']}, Data: {response['data']}")
 
+            # Test a tampered copy of an already-verified token is rejected
+            header, payload, signature = self.guest_token.split(".")
+            signature_char = "A" if signature[0] != "A" else "B"
+            tampered_token = f"{header}.{payload}.{signature_char}{signature[1:]}"
+            response = self.make_request("GET", "/auth/me", auth_token=tampered_token)
+            if response["status_code"] == 401:
+                self.log_result("authentication", "Tampered Token Rejection", True)
+            else:
+                self.log_result("authentication", "Tampered Token Rejection", False,
+                              f"Expected 401, got {response['status_code']}")
+
     def test_users(self):
         """Test user management endpoints"""
         print("\n👤 Testing User Management...")
@@ -199,6 +211,21 @@ class EgyptNestAPITester:
             self.log_result("users", "Update User Profile", False,
                           f"Status: {response['status_code']}, Data: {response['data']}")
 
+        # Test cached user is invalidated by the profile update
+        response = self.make_request("GET", "/users/profile", auth_token=self.guest_token)
+        if response["success"] and response["data"].get("first_name") == "Sarah Updated":
+            self.log_result("users", "Profile Update Visible Through User Cache", True)
+        else:
+            self.log_result("users", "Profile Update Visible Through User Cache", False,
+                          f"Status: {response['status_code']}, Data: {response['data']}")
+
+        response = self.make_request("GET", "/metrics/cache")
+        if response["success"] and response["data"].get("users", {}).get("hits", 0) > 0:
+            self.log_result("users", "User Cache Metrics", True)
+        else:
+            self.log_result("users", "User Cache Metrics", False,
+                          f"Status: {response['status_code']}, Data: {response['data']}")
+
         # Test get user by ID
         if self.guest_user:
             user_id = self.guest_user["id"]
@@ -253,6 +280,15 @@ class EgyptNestAPITester:
             self.log_result("properties", "Create Property", False,
                           f"Status: {response['status_code']}, Data: {response['data']}")
 
+        # Test malformed coordinates are rejected as a validation error
+        malformed_data = {**property_data, "location": {**property_data["location"], "coordinates": {"lat": [1], "lng": 2}}}
+        response = self.make_request("POST", "/properties/", malformed_data, auth_token=self.host_token)
+        if response["status_code"] == 422:
+            self.log_result("properties", "Reject Malformed Coordinates", True)
+        else:
+            self.log_result("properties", "Reject Malformed Coordinates", False,
+                          f"Expected 422, got {response['status_code']}")
+
         # Test guest cannot create property
         if self.guest_token:
             response = self.make_request("POST", "/properties/", property_data, auth_token=self.guest_token)
@@ -278,6 +314,83 @@ class EgyptNestAPITester:
             self.log_result("properties", "Get Properties with Filters", False,
                           f"Status: {response['status_code']}, Data: {response['data']}")
 
+        # Test the summary view leaves out long fields
+        response = self.make_request("GET", "/properties/?view=summary&limit=100")
+        summaries = response["data"].get("properties", [])
+        if response["success"] and summaries and all(
+                "description" not in prop and len(prop.get("images", [])) <= 1 for prop in summaries):
+            self.log_result("properties", "Get Property Summaries", True)
+        else:
+            self.log_result("properties", "Get Property Summaries", False,
+                          f"Status: {response['status_code']}, Data: {response['data']}")
+
+        # Test amenity and capacity filters with facet counts in the same response
+        response = self.make_request("GET", "/properties/?amenities=WiFi,Kitchen&min_bedrooms=2&include_facets=true&limit=100")
+        found = [prop["id"] for prop in response["data"].get("properties", [])]
+        amenity_counts = {facet["value"]: facet["count"] for facet in response["data"].get("facets", {}).get("amenities", [])}
+        if response["success"] and self.test_property_id in found and amenity_counts.get("WiFi") == response["data"].get("total"):
+            self.log_result("properties", "Get Properties with Amenity Facets", True)
+        else:
+            self.log_result("properties", "Get Properties with Amenity Facets", False,
+                          f"Status: {response['status_code']}, Data: {response['data']}")
+
+        # Test listings come back in the requested order
+        response = self.make_request("GET", "/properties/?sort=price_asc&limit=100")
+        prices = [prop["price_per_night"] for prop in response["data"].get("properties", [])]
+        if response["success"] and prices == sorted(prices):
+            self.log_result("properties", "Get Properties Sorted by Price", True)
+        else:
+            self.log_result("properties", "Get Properties Sorted by Price", False,
+                          f"Status: {response['status_code']}, Prices: {prices}")
+
+        # Test Arabic city names resolve to the same indexed city key
+        response = self.make_request("GET", "/properties/?city=القاهرة&city_match=exact&limit=100")
+        found = [prop["id"] for prop in response["data"].get("properties", [])]
+        if response["success"] and self.test_property_id in found:
+            self.log_result("properties", "Get Properties by Arabic City Name", True)
+        else:
+            self.log_result("properties", "Get Properties by Arabic City Name", False,
+                          f"Status: {response['status_code']}, Data: {response['data']}")
+
+        # Test geospatial radius and bounding box search
+        response = self.make_request("GET", "/properties/?near=30.05,31.24&radius_km=5&limit=100")
+        found = [prop["id"] for prop in response["data"].get("properties", [])]
+        if response["success"] and self.test_property_id in found:
+            self.log_result("properties", "Get Properties Near Point", True)
+        else:
+            self.log_result("properties", "Get Properties Near Point", False,
+                          f"Status: {response['status_code']}, Data: {response['data']}")
+
+        response = self.make_request("GET", "/properties/?bbox=31.1,29.9,31.3,30.1&limit=100")
+        found = [prop["id"] for prop in response["data"].get("properties", [])]
+        if response["success"] and self.test_property_id in found:
+            self.log_result("properties", "Get Properties Inside Bounding Box", True)
+        else:
+            self.log_result("properties", "Get Properties Inside Bounding Box", False,
+                          f"Status: {response['status_code']}, Data: {response['data']}")
+
+        response = self.make_request("GET", "/properties/?bbox=29.8,31.1,30.0,31.3&limit=100")
+        found = [prop["id"] for prop in response["data"].get("properties", [])]
+        if response["success"] and self.test_property_id not in found:
+            self.log_result("properties", "Get Properties Outside Bounding Box", True)
+        else:
+            self.log_result("properties", "Get Properties Outside Bounding Box", False,
+                          f"Status: {response['status_code']}, Data: {response['data']}")
+
+        response = self.make_request("GET", "/properties/?near=30.05,31.24&bbox=31.1,29.9,31.3,30.1")
+        if response["status_code"] == 400:
+            self.log_result("properties", "Reject Near With Bounding Box", True)
+        else:
+            self.log_result("properties", "Reject Near With Bounding Box", False,
+                          f"Expected 400, got {response['status_code']}")
+
+        response = self.make_request("GET", "/properties/?near=100,200")
+        if response["status_code"] == 400:
+            self.log_result("properties", "Reject Out Of Range Point", True)
+        else:
+            self.log_result("properties", "Reject Out Of Range Point", False,
+                          f"Expected 400, got {response['status_code']}")
+
         # Test get property by ID
         if self.test_property_id:
             response = self.make_request("GET", f"/properties/{self.test_property_id}")
@@ -287,6 +400,27 @@ class EgyptNestAPITester:
                 self.log_result("properties", "Get Property By ID", False,
                               f"Status: {response['status_code']}, Data: {response['data']}")
 
+            # Test batch lookup keeps request order and reports unknown ids
+            response = self.make_request("GET", f"/properties/batch?ids=missing-property,{self.test_property_id}")
+            returned = [prop["id"] for prop in response["data"].get("properties", [])]
+            if response["success"] and returned == [self.test_property_id] \
+                    and response["data"].get("missing") == ["missing-property"]:
+                self.log_result("properties", "Get Properties Batch", True)
+            else:
+                self.log_result("properties", "Get Properties Batch", False,
+                              f"Status: {response['status_code']}, Data: {response['data']}")
+
+            # Test a repeat read with the ETag is answered with 304 Not Modified
+            url = f"{self.base_url}/properties/{self.test_property_id}"
+            first = requests.get(url, timeout=10)
+            etag = first.headers.get("ETag")
+            second = requests.get(url, headers={"If-None-Match": etag or ""}, timeout=10)
+            if etag and second.status_code == 304 and not second.content:
+                self.log_result("properties", "Property ETag Not Modified", True)
+            else:
+                self.log_result("properties", "Property ETag Not Modified", False,
+                              f"ETag: {etag}, Status: {second.status_code}")
+
         # Test get host properties
         response = self.make_request("GET", "/properties/host/my-properties", auth_token=self.host_token)
         if response["success"] and "properties" in response["data"]:
@@ -341,6 +475,16 @@ class EgyptNestAPITester:
             self.log_result("bookings", "Get User Bookings", False,
                           f"Status: {response['status_code']}, Data: {response['data']}")
 
+        # Test user bookings filtered by status, with property details attached
+        response = self.make_request("GET", "/bookings/my-bookings?status=pending&limit=5", auth_token=self.guest_token)
+        bookings = response["data"].get("bookings", [])
+        if response["success"] and bookings and all(
+                booking["status"] == "pending" and "property" in booking for booking in bookings):
+            self.log_result("bookings", "Get User Bookings by Status", True)
+        else:
+            self.log_result("bookings", "Get User Bookings by Status", False,
+                          f"Status: {response['status_code']}, Data: {response['data']}")
+
         # Test get host bookings
         if self.host_token:
             response = self.make_request("GET", "/bookings/host/bookings", auth_token=self.host_token)
@@ -372,6 +516,35 @@ class EgyptNestAPITester:
             self.log_result("bookings", "Conflicting Booking Prevention", False,
                           f"Expected 400, got {response['status_code']}")
 
+        # Test booked properties drop out of date-range availability search
+        search = (f"/properties/?check_in={(check_in + timedelta(days=1)).date().isoformat()}"
+                  f"&check_out={(check_in + timedelta(days=2)).date().isoformat()}&limit=100")
+        response = self.make_request("GET", search)
+        found = [prop["id"] for prop in response["data"].get("properties", [])]
+        if response["success"] and self.test_property_id not in found:
+            self.log_result("bookings", "Availability Search Excludes Booked Property", True)
+        else:
+            self.log_result("bookings", "Availability Search Excludes Booked Property", False,
+                          f"Status: {response['status_code']}, Data: {response['data']}")
+
+        # Test concurrent requests for the same dates produce exactly one booking
+        race_booking = booking_data.copy()
+        race_booking["check_in"] = (check_in + timedelta(days=30)).isoformat()
+        race_booking["check_out"] = (check_out + timedelta(days=30)).isoformat()
+        
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            responses = list(pool.map(
+                lambda _: self.make_request("POST", "/bookings/", race_booking, auth_token=self.guest_token),
+                range(20)
+            ))
+        created = [r for r in responses if r["success"]]
+        rejected = [r for r in responses if r["status_code"] == 400]
+        if len(created) == 1 and len(rejected) == 19:
+            self.log_result("bookings", "Concurrent Double Booking Prevention", True)
+        else:
+            self.log_result("bookings", "Concurrent Double Booking Prevention", False,
+                          f"Expected 1 booking and 19 rejections, got {len(created)} and {len(rejected)}")
+
     def test_messages(self):
         """Test messaging system endpoints"""
         print("\n💬 Testing Messaging System...")
@@ -428,13 +601,62 @@ class EgyptNestAPITester:
                               f"Status: {response['status_code']}, Data: {response['data']}")
 
             # Test get messages
-            response = self.make_request("GET", f"/messages/{self.test_conversation_id}", auth_token=self.guest_token)
-            if response["success"] and "messages" in response["data"]:
+            messages_response = self.make_request("GET", f"/messages/{self.test_conversation_id}",
+                                                  auth_token=self.guest_token)
+            if messages_response["success"] and "messages" in messages_response["data"]:
                 self.log_result("messages", "Get Messages", True)
             else:
                 self.log_result("messages", "Get Messages", False,
+                              f"Status: {messages_response['status_code']}, Data: {messages_response['data']}")
+
+            # Test unread summary counts the guest's messages the host has not read yet
+            unread_sent = 0
+            for content in ["Are pets allowed?", "Is parking included?"]:
+                response = self.make_request("POST", "/messages/", {**message_data, "content": content},
+                                           auth_token=self.guest_token)
+                if response["success"]:
+                    unread_sent += 1
+            response = self.make_request("GET", "/messages/unread", auth_token=self.host_token)
+            unread = response["data"]
+            if response["success"] and unread.get("total", 0) >= 1 \
+                    and unread.get("conversations", {}).get(self.test_conversation_id) == unread_sent:
+                self.log_result("messages", "Get Unread Summary", True)
+            else:
+                self.log_result("messages", "Get Unread Summary", False,
+                              f"Expected {unread_sent} unread, Status: {response['status_code']}, Data: {unread}")
+
+            # Test bulk mark-as-read clears the host's unread messages in one call
+            response = self.make_request("PUT", f"/messages/conversations/{self.test_conversation_id}/read",
+                                       auth_token=self.host_token)
+            if response["success"] and response["data"].get("unread_total") == 0:
+                self.log_result("messages", "Mark Conversation as Read", True)
+            else:
+                self.log_result("messages", "Mark Conversation as Read", False,
                               f"Status: {response['status_code']}, Data: {response['data']}")
 
+            # Test incremental polling returns nothing new after the newest message; the
+            # cursor comes from a fresh read since more messages were sent above
+            messages_response = self.make_request("GET", f"/messages/{self.test_conversation_id}",
+                                                  auth_token=self.guest_token)
+            next_cursor = messages_response["data"].get("next_cursor")
+            if next_cursor:
+                response = self.make_request("GET", f"/messages/{self.test_conversation_id}?after={next_cursor}",
+                                           auth_token=self.guest_token)
+                if response["success"] and response["data"].get("messages") == []:
+                    self.log_result("messages", "Get Messages After Cursor", True)
+                else:
+                    self.log_result("messages", "Get Messages After Cursor", False,
+                                  f"Status: {response['status_code']}, Data: {response['data']}")
+
+                response = self.make_request("GET", f"/messages/{self.test_conversation_id}"
+                                           f"?after={next_cursor}&before={next_cursor}",
+                                           auth_token=self.guest_token)
+                if response["status_code"] == 400:
+                    self.log_result("messages", "Reject Before With After", True)
+                else:
+                    self.log_result("messages", "Reject Before With After", False,
+                                  f"Expected 400, got {response['status_code']}")
+
     def run_all_tests(self):
         """Run all test suites"""
         print("🚀 Starting EgyptNest Backend API Tests...")